@@ -46,14 +46,14 @@ from models import User, GlobalSettings, CrawlerConfig, CrawlRecord, ReportConfi
 
 # 创建服务实例
 from services.crawler_service import CrawlerService
-from services.llm_service import LLMService
-from services.notification_service import NotificationService
+from services.llm_service import get_llm_service
+from services.notification_service import get_notification_service
 from services.default_config_service import DefaultConfigService
 from services.deep_research_service import DeepResearchService
 
 crawler_service = CrawlerService()
-llm_service = LLMService()
-notification_service = NotificationService()
+llm_service = get_llm_service()
+notification_service = get_notification_service()
 deep_research_service = DeepResearchService(crawler_service, llm_service)
 
 def crawler_job_wrapper(crawler_id):
@@ -219,7 +219,7 @@ def generate_report_task_internal(report):
             logger.warning(f"报告 {report.name} 没有配置数据源")
             return
         
-        crawler_ids = [int(x) for x in report.data_sources.split(',') if x.strip()]
+        crawler_ids = list(map(int, filter(None, map(str.strip, report.data_sources.split(',')))))
         
         # 计算时间范围
         from datetime import datetime, timedelta
@@ -1137,7 +1137,7 @@ def generate_report_once(report_id):
                     if not report.data_sources:
                         return
                     
-                    crawler_ids = [int(x) for x in report.data_sources.split(',') if x.strip()]
+                    crawler_ids = list(map(int, filter(None, map(str.strip, report.data_sources.split(',')))))
                     
                     # 计算时间范围
                     from datetime import datetime, timedelta
@@ -33,8 +33,8 @@ def main():
     print("=" * 60)
     
     # 检查Python版本
-    if sys.version_info < (3, 8):
-        print("❌ 需要Python 3.8或更高版本")
+    if sys.version_info < (3, 9):
+        print("❌ 需要Python 3.9或更高版本")
         sys.exit(1)
     
     # 设置数据库
@@ -323,8 +323,9 @@ class CrawlerService:
             start_idx = 0
             for i, line in enumerate(lines):
                 line = line.strip()
+                line_lower = line.lower()
                 if (line and len(line) > 20 and 
-                    not any(keyword in line.lower() for keyword in [
+                    not any(keyword in line_lower for keyword in [
                         '首页', '导航', '菜单', '登录', '注册', '搜索', '网站地图'
                     ]) and
                     ('新华网' in line or '记者' in line or line.endswith('电') or '日' in line)):
@@ -334,8 +335,8 @@ class CrawlerService:
         # 找到文章结束位置
         end_idx = len(lines)
         for i in range(start_idx + 1, len(lines)):
-            line = lines[i].strip()
-            if any(keyword in line.lower() for keyword in [
+            line_lower = lines[i].strip().lower()
+            if any(keyword in line_lower for keyword in [
                 'copyright', '版权所有', '制作单位', '责任编辑', '纠错'
             ]):
                 end_idx = i
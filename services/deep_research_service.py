@@ -8,22 +8,128 @@
 import asyncio
 import logging
 import xml.etree.ElementTree as ET
-from typing import List, Dict, Any, Tuple
+from typing import List, Dict, Any, Tuple, Optional, Set
 from datetime import datetime
+from functools import lru_cache, wraps
 import re
 
-from services.notification_service import NotificationService
+from services.notification_service import get_notification_service
 
 logger = logging.getLogger(__name__)
 
+# 搜索结果时效性评分：最新时间词汇每个100分，近期时间词汇每个50分
+RECENCY_KEYWORD_WEIGHTS = {
+    **dict.fromkeys(['2025', '最新', '今日', '刚刚', 'latest', 'today'], 100),
+    **dict.fromkeys(['2024', '近期', '最近', 'recent', 'new'], 50),
+}
+# 日期年份得分，其他年份10分
+YEAR_SCORES = {'2025': 90, '2024': 60, '2023': 30}
+
+_RECENCY_KEYWORD_RE = re.compile('|'.join(map(re.escape, RECENCY_KEYWORD_WEIGHTS)))
+_YEAR_RE = re.compile('|'.join(YEAR_SCORES))
+
+# AI响应中各XML标签的提取正则，模块加载时预编译一次
+_TAG_RE = {
+    tag: re.compile(rf'<{tag}>(.*?)</{tag}>', re.DOTALL)
+    for tag in (
+        'keywords_to_search', 'urls_to_crawl',
+        'current_knowledge', 'knowledge_gaps', 'research_directions', 'priority_keywords',
+        'action', 'reasoning', 'keywords',
+    )
+}
+
+# knowledge_base XML中单篇文章的模板
+_KB_ARTICLE_TEMPLATE = (
+    "<article id='{i}'>\n"
+    "<title>{title}</title>\n"
+    "<url>{url}</url>\n"
+    "<source>{source}</source>\n"
+    "<date>{date}</date>\n"
+    "<content>{content}</content>\n"
+    "</article>\n"
+)
+
+# 研究决策响应的结束标记：解析时<finish />优先于关键词，只有它出现后结果不会再改变，
+# 因此</keywords_to_search>不能作为停止标记（其后仍可能出现<finish />）
+RESEARCH_DECISION_MARKERS = ('<finish />', '<finish/>')
+# 初步分析与指导式研究决策响应的结束标签
+INITIAL_ANALYSIS_MARKERS = ('</analysis>',)
+GUIDED_DECISION_MARKERS = ('</research_decision>',)
+
+@lru_cache(maxsize=2048)
+def _score_recency(title: str, snippet: str, date_str: str) -> int:
+    """时效性评分内核，只依赖字符串输入，结果可缓存复用"""
+    # 用不可见分隔符拼接，避免关键词跨越标题和摘要的边界
+    text = (title + '\x1f' + snippet).lower()
+    date_score = sum(RECENCY_KEYWORD_WEIGHTS[kw] for kw in set(_RECENCY_KEYWORD_RE.findall(text)))
+    
+    # 如果有具体日期，按其中最新的年份给分
+    if date_str:
+        date_score += max((YEAR_SCORES[year] for year in _YEAR_RE.findall(date_str)), default=10)
+    
+    return date_score
+
+def score_result_recency(result: Dict) -> int:
+    """计算搜索结果的时效性得分，多轮搜索中重复出现的结果直接命中缓存"""
+    return _score_recency(result.get('title', ''), result.get('snippet', ''), result.get('date') or '')
+
+def rank_results_by_recency(search_results: List[Dict]) -> List[Tuple[Dict, int]]:
+    """批量计算时效性得分并按分数从高到低排序，同分保持原有顺序"""
+    scores = list(map(score_result_recency, search_results))
+    order = sorted(range(len(scores)), key=scores.__getitem__, reverse=True)
+    return [(search_results[i], scores[i]) for i in order]
+
+def dedupe_articles_by_url(articles: List[Dict], seen: Optional[Set[str]] = None) -> List[Dict]:
+    """按URL去重并保持原有顺序，没有URL的文章原样保留；传入seen可跨批次去重"""
+    if seen is None:
+        seen = set()
+    unique = []
+    for article in articles:
+        url = article.get('url')
+        if url:
+            if url in seen:
+                continue
+            seen.add(url)
+        unique.append(article)
+    return unique
+
+class _StartIntervalLimiter:
+    """限制请求的发起频率：相邻两次请求的启动时间至少间隔interval秒"""
+    
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._lock = asyncio.Lock()
+        self._next_start = 0.0
+    
+    async def wait(self):
+        """等到允许发起下一次请求"""
+        async with self._lock:
+            loop = asyncio.get_running_loop()
+            delay = self._next_start - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            self._next_start = loop.time() + self.interval
+
+def _memoize_parse(parse_func):
+    """按响应文本缓存解析结果；返回浅拷贝（列表字段也复制），调用方修改不会污染缓存"""
+    cached = lru_cache(maxsize=256)(parse_func)
+    
+    @wraps(parse_func)
+    def wrapper(response: str) -> Dict[str, Any]:
+        result = cached(response)
+        return {k: list(v) if isinstance(v, list) else v for k, v in result.items()}
+    return wrapper
+
 class DeepResearchService:
     """深度研究服务类 - V3.0 XML交互版"""
     
     def __init__(self, crawler_service, llm_service):
         self.crawler_service = crawler_service
         self.llm_service = llm_service
-        self.notification_service = NotificationService()
+        self.notification_service = get_notification_service()
         self.max_iterations = 30
+        self.max_concurrent_crawls = 3  # 搜索结果同时爬取的URL数上限
+        self.min_request_interval = 2.0  # 搜索和爬取请求之间的最小启动间隔（秒），避免被限制
         
     async def conduct_deep_research(self, report_config, settings) -> Dict[str, Any]:
         """执行深度研究流程"""
@@ -61,6 +167,7 @@ class DeepResearchService:
             # 3. 开始迭代研究 - AI判断现有资料是否足够写报告
             iteration_count = 0
             research_log = []
+            seen_urls = {article['url'] for article in knowledge_base if article.get('url')}
             
             while iteration_count < self.max_iterations:
                 iteration_count += 1
@@ -96,7 +203,8 @@ class DeepResearchService:
                         settings
                     )
                     
-                    # 扩充knowledge_base
+                    # 扩充knowledge_base，跳过已在知识库中的URL
+                    new_articles = dedupe_articles_by_url(new_articles, seen_urls)
                     knowledge_base.extend(new_articles)
                     logger.info(f"第 {iteration_count} 轮: 新增 {len(new_articles)} 篇文章到知识库")
                 else:
@@ -152,18 +260,32 @@ class DeepResearchService:
         if not report_config.data_sources:
             return knowledge_base
         
-        crawler_ids = [int(x) for x in report_config.data_sources.split(',') if x.strip()]
+        crawler_ids = list(map(int, filter(None, map(str.strip, report_config.data_sources.split(',')))))
         
         # 导入需要在函数内部进行
-        from models import CrawlerConfig, CrawlRecord
+        from models import CrawlerConfig
         from datetime import timedelta
         
+        # 一次查询取回所有数据源的爬虫配置，时间范围的截止时间也只计算一次
+        crawlers = {
+            crawler.id: crawler
+            for crawler in CrawlerConfig.query.filter(CrawlerConfig.id.in_(crawler_ids)).all()
+        }
+        time_range_hours = self._parse_time_range(report_config.time_range)
+        cutoff_time = datetime.utcnow() - timedelta(hours=time_range_hours)
+        logger.info(f"查询时间范围: {time_range_hours}小时，截止时间: {cutoff_time}")
+        
         # 从每个爬虫获取文章（增加单个爬虫处理超时）
         for crawler_id in crawler_ids:
+            crawler = crawlers.get(crawler_id)
+            if not crawler:
+                logger.warning(f"未找到爬虫ID: {crawler_id}")
+                continue
+            
             try:
                 # 为每个爬虫设置5秒超时
                 await asyncio.wait_for(
-                    self._process_single_crawler(crawler_id, report_config, knowledge_base),
+                    self._process_single_crawler(crawler, cutoff_time, knowledge_base),
                     timeout=5.0
                 )
             except asyncio.TimeoutError:
@@ -184,6 +306,9 @@ class DeepResearchService:
         except Exception as e:
             logger.error(f"获取深度研究历史数据失败: {e}")
         
+        # 同一URL可能被多个数据源爬到，先去重再过滤，避免重复内容占用过滤和提示词的开销
+        knowledge_base = dedupe_articles_by_url(knowledge_base)
+        
         # 应用关键词过滤
         if report_config.filter_keywords:
             logger.info(f"开始关键词过滤，当前文章数: {len(knowledge_base)}")
@@ -199,27 +324,16 @@ class DeepResearchService:
         logger.info(f"初始知识库构建完成，共 {len(knowledge_base)} 篇文章")
         return knowledge_base
     
-    async def _process_single_crawler(self, crawler_id: int, report_config, knowledge_base: List[Dict]):
+    async def _process_single_crawler(self, crawler, cutoff_time: datetime, knowledge_base: List[Dict]):
         """处理单个爬虫的数据获取"""
-        from models import CrawlerConfig, CrawlRecord
-        from datetime import timedelta
-        
-        logger.info(f"正在处理爬虫ID: {crawler_id}")
-        crawler = CrawlerConfig.query.get(crawler_id)
-        if not crawler:
-            logger.warning(f"未找到爬虫ID: {crawler_id}")
-            return
+        from models import CrawlRecord
         
+        logger.info(f"正在处理爬虫ID: {crawler.id}")
         logger.info(f"从爬虫 '{crawler.name}' 获取数据...")
         
         # 先尝试从历史记录获取
-        time_range_hours = self._parse_time_range(report_config.time_range)
-        cutoff_time = datetime.utcnow() - timedelta(hours=time_range_hours)
-        
-        logger.info(f"查询时间范围: {time_range_hours}小时，截止时间: {cutoff_time}")
-        
         records = CrawlRecord.query.filter(
-            CrawlRecord.crawler_config_id == crawler_id,
+            CrawlRecord.crawler_config_id == crawler.id,
             CrawlRecord.status == 'success',
             CrawlRecord.crawled_at >= cutoff_time
         ).order_by(
@@ -344,13 +458,23 @@ class DeepResearchService:
         ]
         
         try:
-            response = self.llm_service._make_request(messages, temperature=0.3)
+            # 流式读取，看到<finish />即可停止；给出关键词时需读完整段响应
+            response = await asyncio.to_thread(
+                self.llm_service._make_request,
+                messages,
+                temperature=0.3,
+                stream=True,
+                stop_markers=RESEARCH_DECISION_MARKERS,
+                echo=False
+            )
             return self._parse_ai_response(response)
         except Exception as e:
             logger.error(f"AI研究提示失败: {e}")
             return {'action': 'finish', 'details': f'AI调用失败: {e}'}
     
-    def _parse_ai_response(self, response: str) -> Dict[str, Any]:
+    @staticmethod
+    @_memoize_parse
+    def _parse_ai_response(response: str) -> Dict[str, Any]:
         """解析AI的XML响应"""
         try:
             response = response.strip()
@@ -360,7 +484,7 @@ class DeepResearchService:
                 return {'action': 'finish', 'details': 'AI决定研究已完成'}
             
             # 解析keywords_to_search
-            keywords_match = re.search(r'<keywords_to_search>(.*?)</keywords_to_search>', response, re.DOTALL)
+            keywords_match = _TAG_RE['keywords_to_search'].search(response)
             if keywords_match:
                 keywords_text = keywords_match.group(1).strip()
                 keywords = [k.strip() for k in keywords_text.split(',') if k.strip()]
@@ -380,67 +504,101 @@ class DeepResearchService:
     
     async def _execute_search_and_crawl(self, keywords: List[str], urls: List[str], settings) -> List[Dict]:
         """执行搜索和爬取"""
+        # 每爬取成功一篇即加入列表，超时时已爬取的文章仍然保留
+        new_articles = []
         try:
             # 设置整个搜索和爬取过程的超时时间为60秒
-            return await asyncio.wait_for(
-                self._execute_search_and_crawl_impl(keywords, urls, settings),
+            await asyncio.wait_for(
+                self._execute_search_and_crawl_impl(keywords, urls, settings, new_articles),
                 timeout=60.0
             )
         except asyncio.TimeoutError:
-            logger.error("搜索和爬取过程超时（60秒），返回已获取的结果")
-            return []
+            logger.error(f"搜索和爬取过程超时（60秒），返回已获取的 {len(new_articles)} 篇文章")
         except Exception as e:
             logger.error(f"搜索和爬取过程失败: {e}")
-            return []
+        return new_articles
     
-    async def _execute_search_and_crawl_impl(self, keywords: List[str], urls: List[str], settings) -> List[Dict]:
-        """执行搜索和爬取的具体实现"""
-        new_articles = []
+    async def _execute_search_and_crawl_impl(self, keywords: List[str], urls: List[str], settings,
+                                             new_articles: List[Dict]):
+        """执行搜索和爬取的具体实现，爬取到的文章追加到new_articles"""
+        # 1. 并发执行搜索
+        keywords = keywords[:3]  # 限制搜索关键词数量
+        logger.info(f"搜索关键词: {keywords}")
+        # 搜索和爬取共用一个限速器，并发执行但请求按最小间隔依次发出
+        rate_limiter = _StartIntervalLimiter(self.min_request_interval)
+        search_batches = await asyncio.gather(*(
+            self._rate_limited_search(keyword, settings.serp_api_key, rate_limiter)
+            for keyword in keywords
+        ))
         
-        # 1. 执行搜索
-        for keyword in keywords[:3]:  # 限制搜索关键词数量
-            logger.info(f"搜索关键词: {keyword}")
-            
-            search_results = self.llm_service.search_web_for_topic(keyword, settings.serp_api_key)
-            
-            if search_results:
-                # 让AI筛选要爬取的URL
-                urls_to_crawl = await self._ai_select_urls(search_results, keyword)
-                
-                # 爬取选中的URL并入库
-                for i, url in enumerate(urls_to_crawl[:3]):  # 每个关键词最多爬3个URL
-                    try:
-                        # 先检查URL是否已存在于数据库
-                        if await self._url_exists_in_db(url):
-                            logger.info(f"URL已存在于数据库，跳过: {url}")
-                            continue
-                            
-                        logger.info(f"正在爬取第 {i+1}/{min(len(urls_to_crawl), 3)} 个URL: {url[:50]}...")
-                        result = await self.crawler_service.crawl_article_content(url)
-                        if result['success']:
-                            # 添加到新文章列表
-                            article_data = {
-                                'title': result['title'],
-                                'content': result['content'],
-                                'url': result['url'],
-                                'author': result.get('author', ''),
-                                'date': result.get('date', ''),
-                                'source': f'搜索: {keyword}',
-                                'crawled_at': datetime.now().isoformat()
-                            }
-                            new_articles.append(article_data)
-                            
-                            # 保存到数据库 - 创建一个特殊的"深度研究"爬虫记录
-                            await self._save_search_result_to_db(result, keyword)
-                            
-                            logger.info(f"成功爬取并入库: {result['title'][:50]}...")
-                    except Exception as e:
-                        logger.error(f"爬取URL失败 {url}: {e}")
-            
-            # 添加延迟避免被限制
-            await asyncio.sleep(2)
+        # 2. 各关键词并发筛选URL并爬取，爬取总并发受信号量限制，发起频率受限速器限制
+        crawl_semaphore = asyncio.Semaphore(self.max_concurrent_crawls)
+        claimed_urls = set()
+        await asyncio.gather(*(
+            self._select_and_crawl(keyword, search_results, crawl_semaphore, rate_limiter,
+                                   claimed_urls, new_articles)
+            for keyword, search_results in zip(keywords, search_batches)
+        ))
+    
+    async def _rate_limited_search(self, keyword: str, serp_api_key: str,
+                                   rate_limiter: _StartIntervalLimiter) -> List[Dict]:
+        """按限速器的节奏发起一次搜索"""
+        await rate_limiter.wait()
+        return await self.llm_service.search_web_for_topic_async(keyword, serp_api_key)
+    
+    async def _select_and_crawl(self, keyword: str, search_results: List[Dict],
+                                crawl_semaphore: asyncio.Semaphore, rate_limiter: _StartIntervalLimiter,
+                                claimed_urls: Set[str], new_articles: List[Dict]):
+        """为单个关键词筛选URL并并发爬取；claimed_urls跨关键词共享，同一URL只爬一次"""
+        if not search_results:
+            return
         
-        return new_articles
+        # 让AI筛选要爬取的URL
+        urls_to_crawl = await self._ai_select_urls(search_results, keyword)
+        
+        urls = []
+        for url in urls_to_crawl[:3]:  # 每个关键词最多爬3个URL
+            if url not in claimed_urls:
+                claimed_urls.add(url)
+                urls.append(url)
+        
+        await asyncio.gather(*(
+            self._crawl_search_url(url, keyword, crawl_semaphore, rate_limiter, new_articles, i, len(urls))
+            for i, url in enumerate(urls, 1)
+        ))
+    
+    async def _crawl_search_url(self, url: str, keyword: str, crawl_semaphore: asyncio.Semaphore,
+                                rate_limiter: _StartIntervalLimiter, new_articles: List[Dict],
+                                index: int, total: int):
+        """爬取单个搜索结果URL并入库，成功后立即追加到new_articles；失败或已存在时跳过"""
+        try:
+            # 先检查URL是否已存在于数据库
+            if await self._url_exists_in_db(url):
+                logger.info(f"URL已存在于数据库，跳过: {url}")
+                return
+            
+            # 先按限速器排队，拿到发起时机后再占用爬取并发名额，等待间隔期间不占名额
+            await rate_limiter.wait()
+            async with crawl_semaphore:
+                logger.info(f"正在爬取第 {index}/{total} 个URL: {url[:50]}...")
+                result = await self.crawler_service.crawl_article_content(url)
+            
+            if result['success']:
+                # 保存到数据库 - 创建一个特殊的"深度研究"爬虫记录
+                await self._save_search_result_to_db(result, keyword)
+                logger.info(f"成功爬取并入库: {result['title'][:50]}...")
+                
+                new_articles.append({
+                    'title': result['title'],
+                    'content': result['content'],
+                    'url': result['url'],
+                    'author': result.get('author', ''),
+                    'date': result.get('date', ''),
+                    'source': f'搜索: {keyword}',
+                    'crawled_at': datetime.now().isoformat()
+                })
+        except Exception as e:
+            logger.error(f"爬取URL失败 {url}: {e}")
     
     async def _url_exists_in_db(self, url: str) -> bool:
         """检查URL是否已存在于数据库中"""
@@ -501,43 +659,8 @@ class DeepResearchService:
     async def _ai_select_urls(self, search_results: List[Dict], keyword: str) -> List[str]:
         """让AI从搜索结果中选择要爬取的URL，优先选择最新的内容"""
         
-        # 按日期排序搜索结果，优先显示最新的
-        sorted_results = []
-        for result in search_results:
-            date_score = 0
-            
-            # 检查标题和摘要中的时间相关词汇
-            title = result.get('title', '').lower()
-            snippet = result.get('snippet', '').lower()
-            
-            # 最新时间词汇得分最高
-            latest_keywords = ['2025', '最新', '今日', '刚刚', 'latest', 'today']
-            recent_keywords = ['2024', '近期', '最近', 'recent', 'new']
-            
-            for keyword in latest_keywords:
-                if keyword in title or keyword in snippet:
-                    date_score += 100
-            
-            for keyword in recent_keywords:
-                if keyword in title or keyword in snippet:
-                    date_score += 50
-            
-            # 如果有具体日期，根据年份给分
-            if result.get('date'):
-                date_str = result['date']
-                if '2025' in date_str:
-                    date_score += 90
-                elif '2024' in date_str:
-                    date_score += 60
-                elif '2023' in date_str:
-                    date_score += 30
-                else:
-                    date_score += 10  # 其他年份较低分数
-            
-            sorted_results.append((result, date_score))
-        
-        # 按分数排序，分数高的在前
-        sorted_results.sort(key=lambda x: x[1], reverse=True)
+        # 按时效性得分排序搜索结果，分数高的在前
+        sorted_results = rank_results_by_recency(search_results)
         
         # 构建搜索结果描述，优先显示最新的
         results_text = ""
@@ -579,10 +702,11 @@ URL3
         ]
         
         try:
-            response = self.llm_service._make_request(messages, temperature=0.2)
+            # 同步请求放到线程中，多个关键词的筛选可以并发进行
+            response = await asyncio.to_thread(self.llm_service._make_request, messages, temperature=0.2)
             
             # 解析URLs
-            urls_match = re.search(r'<urls_to_crawl>(.*?)</urls_to_crawl>', response, re.DOTALL)
+            urls_match = _TAG_RE['urls_to_crawl'].search(response)
             if urls_match:
                 urls_text = urls_match.group(1).strip()
                 urls = [url.strip() for url in urls_text.split('\n') if url.strip() and url.strip().startswith('http')]
@@ -594,39 +718,7 @@ URL3
         except Exception as e:
             logger.error(f"AI选择URL失败: {e}")
             # 默认选择按时效性排序后的前3个
-            sorted_results = []
-            for result in search_results:
-                date_score = 0
-                title = result.get('title', '').lower()
-                snippet = result.get('snippet', '').lower()
-                
-                # 最新时间词汇得分最高
-                latest_keywords = ['2025', '最新', '今日', '刚刚', 'latest', 'today']
-                recent_keywords = ['2024', '近期', '最近', 'recent', 'new']
-                
-                for keyword in latest_keywords:
-                    if keyword in title or keyword in snippet:
-                        date_score += 100
-                
-                for keyword in recent_keywords:
-                    if keyword in title or keyword in snippet:
-                        date_score += 50
-                
-                # 如果有具体日期，根据年份给分
-                if result.get('date'):
-                    date_str = result['date']
-                    if '2025' in date_str:
-                        date_score += 90
-                    elif '2024' in date_str:
-                        date_score += 60
-                    elif '2023' in date_str:
-                        date_score += 30
-                    else:
-                        date_score += 10
-                
-                sorted_results.append((result, date_score))
-            
-            sorted_results.sort(key=lambda x: x[1], reverse=True)
+            sorted_results = rank_results_by_recency(search_results)
             return [result[0]['url'] for result in sorted_results[:3] if result[0].get('url')]
     
     async def _ai_initial_analysis(self, knowledge_base: List[Dict], report_config) -> Dict[str, Any]:
@@ -685,7 +777,14 @@ URL3
             ]
             
             logger.info("开始AI初步分析，使用流式返回...")
-            response = self.llm_service._make_request(messages, temperature=0.3, stream=True)
+            # 读到</analysis>即停止接收，剩余输出不影响解析
+            response = await asyncio.to_thread(
+                self.llm_service._make_request,
+                messages,
+                temperature=0.3,
+                stream=True,
+                stop_markers=INITIAL_ANALYSIS_MARKERS
+            )
             if not response:
                 return {'summary': '初步分析失败', 'directions': [], 'keywords': []}
             
@@ -699,11 +798,11 @@ URL3
             logger.error(f"AI初步分析失败: {e}")
             return {'summary': f'分析失败: {e}', 'directions': [], 'keywords': []}
     
-    def _parse_initial_analysis(self, ai_response: str) -> Dict[str, Any]:
+    @staticmethod
+    @_memoize_parse
+    def _parse_initial_analysis(ai_response: str) -> Dict[str, Any]:
         """解析AI的初步分析结果"""
         try:
-            import re
-            
             result = {
                 'summary': '',
                 'gaps': '',
@@ -712,17 +811,17 @@ URL3
             }
             
             # 提取current_knowledge
-            knowledge_match = re.search(r'<current_knowledge>(.*?)</current_knowledge>', ai_response, re.DOTALL)
+            knowledge_match = _TAG_RE['current_knowledge'].search(ai_response)
             if knowledge_match:
                 result['summary'] = knowledge_match.group(1).strip()
             
             # 提取knowledge_gaps
-            gaps_match = re.search(r'<knowledge_gaps>(.*?)</knowledge_gaps>', ai_response, re.DOTALL)
+            gaps_match = _TAG_RE['knowledge_gaps'].search(ai_response)
             if gaps_match:
                 result['gaps'] = gaps_match.group(1).strip()
             
             # 提取research_directions
-            directions_match = re.search(r'<research_directions>(.*?)</research_directions>', ai_response, re.DOTALL)
+            directions_match = _TAG_RE['research_directions'].search(ai_response)
             if directions_match:
                 directions_text = directions_match.group(1).strip()
                 # 按行分割，每行是一个研究方向
@@ -730,7 +829,7 @@ URL3
                 result['directions'] = directions
             
             # 提取priority_keywords
-            keywords_match = re.search(r'<priority_keywords>(.*?)</priority_keywords>', ai_response, re.DOTALL)
+            keywords_match = _TAG_RE['priority_keywords'].search(ai_response)
             if keywords_match:
                 keywords_text = keywords_match.group(1).strip()
                 keywords = [k.strip() for k in keywords_text.split(',') if k.strip()]
@@ -802,7 +901,15 @@ URL3
                 }
             ]
             
-            response = self.llm_service._make_request(messages, temperature=0.3, stream=False)  # 决策不需要流式
+            # 流式读取，看到</research_decision>即停止，不必等待整段响应
+            response = await asyncio.to_thread(
+                self.llm_service._make_request,
+                messages,
+                temperature=0.3,
+                stream=True,
+                stop_markers=GUIDED_DECISION_MARKERS,
+                echo=False
+            )
             if not response:
                 return {'action': 'finish', 'details': 'AI无响应，结束研究'}
             
@@ -816,26 +923,26 @@ URL3
             logger.error(f"发送指导研究提示失败: {e}")
             return {'action': 'finish', 'details': f'发送提示失败: {e}'}
     
-    def _parse_research_decision(self, ai_response: str) -> Dict[str, Any]:
+    @staticmethod
+    @_memoize_parse
+    def _parse_research_decision(ai_response: str) -> Dict[str, Any]:
         """解析AI的研究决策"""
         try:
-            import re
-            
             result = {'action': 'finish', 'details': 'AI决策解析失败'}
             
             # 提取action
-            action_match = re.search(r'<action>(.*?)</action>', ai_response, re.DOTALL)
+            action_match = _TAG_RE['action'].search(ai_response)
             if action_match:
                 result['action'] = action_match.group(1).strip().lower()
             
             # 提取reasoning
-            reasoning_match = re.search(r'<reasoning>(.*?)</reasoning>', ai_response, re.DOTALL)
+            reasoning_match = _TAG_RE['reasoning'].search(ai_response)
             if reasoning_match:
                 result['details'] = reasoning_match.group(1).strip()
             
             # 如果是搜索动作，提取关键词
             if result['action'] == 'search':
-                keywords_match = re.search(r'<keywords>(.*?)</keywords>', ai_response, re.DOTALL)
+                keywords_match = _TAG_RE['keywords'].search(ai_response)
                 if keywords_match:
                     keywords_text = keywords_match.group(1).strip()
                     keywords = [k.strip() for k in keywords_text.split(',') if k.strip()]
@@ -1073,19 +1180,20 @@ URL3
     
     def _build_knowledge_base_xml(self, knowledge_base: List[Dict]) -> str:
         """构建knowledge_base XML"""
-        xml_content = "<knowledge_base>\n"
-        
-        for i, article in enumerate(knowledge_base, 1):
-            xml_content += f"<article id='{i}'>\n"
-            xml_content += f"<title>{self._escape_xml(article.get('title', ''))}</title>\n"
-            xml_content += f"<url>{self._escape_xml(article.get('url', ''))}</url>\n"
-            xml_content += f"<source>{self._escape_xml(article.get('source', ''))}</source>\n"
-            xml_content += f"<date>{self._escape_xml(article.get('date', ''))}</date>\n"
-            xml_content += f"<content>{self._escape_xml(article.get('content', '')[:2000])}</content>\n"  # 限制长度
-            xml_content += f"</article>\n"
-        
-        xml_content += "</knowledge_base>"
-        return xml_content
+        escape = self._escape_xml
+        # 各篇文章格式化后一次性拼接，避免在循环中反复拼接长字符串
+        articles_xml = "".join(
+            _KB_ARTICLE_TEMPLATE.format(
+                i=i,
+                title=escape(article.get('title', '')),
+                url=escape(article.get('url', '')),
+                source=escape(article.get('source', '')),
+                date=escape(article.get('date', '')),
+                content=escape(article.get('content', '')[:2000])  # 限制长度
+            )
+            for i, article in enumerate(knowledge_base, 1)
+        )
+        return f"<knowledge_base>\n{articles_xml}</knowledge_base>"
     
     def _escape_xml(self, text: str) -> str:
         """转义XML特殊字符"""
@@ -5,19 +5,185 @@
 支持通义千问、OpenRouter等多种LLM服务商
 """
 
+import asyncio
 import requests
 import json
 import logging
-from typing import List, Dict, Any
+import os
+import re
+import time
+import hashlib
+from urllib.parse import urlsplit, unquote_plus
+from functools import lru_cache
+from typing import List, Dict, Any, Tuple
 from datetime import datetime
 
+# orjson解析大体积JSON更快，未安装时回退到标准库
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+_json_loads = orjson.loads if ORJSON_AVAILABLE else json.loads
+
 logger = logging.getLogger(__name__)
 
+# Google重定向链接前缀，仅此类链接需要提取真实URL
+GOOGLE_REDIRECT_PREFIXES = ('https://www.google.com/url?', 'http://www.google.com/url?')
+_REDIRECT_RE = re.compile(r'[?&]url=([^&]+)')
+
+@lru_cache(maxsize=4096)
+def extract_redirect_target(url: str) -> str:
+    """从Google重定向链接中提取真实URL，非重定向链接原样返回"""
+    if not url.startswith(GOOGLE_REDIRECT_PREFIXES):
+        return url
+    match = _REDIRECT_RE.search(url)
+    return unquote_plus(match.group(1)) if match else url
+
+def _source_from_url(url: str) -> str:
+    """从URL推断来源域名，无法解析时返回截断后的原始字符串"""
+    if '://' in url:
+        try:
+            return urlsplit(url).netloc
+        except ValueError:
+            # 格式错误的URL（如未闭合的IPv6方括号）按普通字符串处理
+            pass
+    return url[:50] + '...' if len(url) > 50 else url
+
+def _to_search_result(result: Dict) -> Dict:
+    """把单条SerpAPI结果转换为统一的搜索结果结构"""
+    # 处理redirect_link，提取真实URL
+    url = extract_redirect_target(result.get('redirect_link') or '')
+    return {
+        'title': result.get('title', ''),
+        'url': url,
+        'snippet': result.get('snippet', ''),
+        'source': _source_from_url(url),
+        'date': result.get('date', ''),
+        'position': result.get('position', 0)
+    }
+
+def parse_organic_results(organic_results: List[Dict]) -> List[Dict]:
+    """一次性转换SerpAPI的organic_results"""
+    return list(map(_to_search_result, organic_results))
+
+@lru_cache(maxsize=64)
+def _keyword_filter_pattern(keywords: str):
+    """把逗号分隔的关键词编译成一个忽略大小写的交替匹配正则，没有有效关键词时返回None"""
+    keyword_list = [k.strip().lower() for k in keywords.split(',') if k.strip()]
+    if not keyword_list:
+        return None
+    return re.compile('|'.join(map(re.escape, keyword_list)), re.IGNORECASE)
+
+# 搜索结果磁盘缓存（开发/测试用，默认关闭）：设置 SERP_CACHE=1 后同一查询在
+# SERP_CACHE_TTL 秒（默认一天）内直接复用，生产环境的深度研究始终获取最新结果
+SEARCH_CACHE_ENABLED = os.getenv('SERP_CACHE') == '1'
+SEARCH_CACHE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '.serp_cache')
+SEARCH_CACHE_TTL = int(os.getenv('SERP_CACHE_TTL', 24 * 3600))
+SEARCH_CACHE_MAX_AGE = 30 * 24 * 3600
+_search_cache_pruned = False
+
+def _search_cache_path(topic: str, serp_api_key: str) -> str:
+    """按规范化查询和API Key摘要生成缓存文件路径"""
+    key_hash = hashlib.sha256(serp_api_key.encode('utf-8')).hexdigest()[:16]
+    digest = hashlib.sha256(f"{topic.strip().lower()}\x1f{key_hash}".encode('utf-8')).hexdigest()
+    return os.path.join(SEARCH_CACHE_DIR, f"{digest}.json")
+
+def _prune_search_cache():
+    """清理超过30天的旧缓存文件，每个进程只在首次使用缓存时执行一次"""
+    global _search_cache_pruned
+    if _search_cache_pruned:
+        return
+    _search_cache_pruned = True
+    expire_before = time.time() - SEARCH_CACHE_MAX_AGE
+    try:
+        with os.scandir(SEARCH_CACHE_DIR) as entries:
+            for entry in entries:
+                if entry.name.endswith('.json') and entry.stat().st_mtime < expire_before:
+                    os.remove(entry.path)
+    except OSError:
+        pass
+
+def _load_cached_search(path: str):
+    """读取未过期的搜索缓存，不存在或已过期时返回None"""
+    _prune_search_cache()
+    try:
+        if time.time() - os.path.getmtime(path) > SEARCH_CACHE_TTL:
+            return None
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def _store_cached_search(path: str, results: List[Dict]):
+    """写入搜索缓存"""
+    try:
+        os.makedirs(SEARCH_CACHE_DIR, exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        logger.warning(f"写入搜索缓存失败: {e}")
+
+# 搜索API重试策略：连接异常和服务端错误时指数退避重试；429只在服务端给出Retry-After时按其等待重试。
+# 重试总耗时不超过SEARCH_RETRY_BUDGET秒，远低于深度研究60秒的整体超时
+SEARCH_MAX_ATTEMPTS = 3
+SEARCH_RETRY_STATUS = {429, 500, 502, 503, 504}
+SEARCH_RETRY_BUDGET = 10.0
+
+def _retry_delay(response, attempt: int):
+    """计算下一次重试前的等待秒数，不应重试时返回None"""
+    if response is None or response.status_code != 429:
+        return 2 ** attempt
+    # 限流时盲目重试只会继续消耗额度，只按服务端给出的Retry-After等待
+    retry_after = response.headers.get('Retry-After', '')
+    return float(retry_after) if retry_after.isdigit() else None
+
+def _get_with_retry(session: requests.Session, url: str, params: Dict, timeout: int = 30):
+    """GET请求失败时按1、2秒指数退避重试，总耗时超出SEARCH_RETRY_BUDGET时不再重试"""
+    deadline = time.monotonic() + SEARCH_RETRY_BUDGET
+    for attempt in range(SEARCH_MAX_ATTEMPTS):
+        last_attempt = attempt == SEARCH_MAX_ATTEMPTS - 1
+        response = None
+        try:
+            response = session.get(url, params=params, timeout=timeout)
+            if response.status_code not in SEARCH_RETRY_STATUS or last_attempt:
+                return response
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+            if last_attempt:
+                raise
+            error = e
+        
+        delay = _retry_delay(response, attempt)
+        if delay is None or time.monotonic() + delay > deadline:
+            if response is None:
+                raise error
+            return response
+        
+        reason = response.status_code if response is not None else error
+        logger.warning(f"搜索API请求失败: {reason}，{delay:g}秒后第 {attempt + 1} 次重试")
+        time.sleep(delay)
+
+# 共享会话的单主机连接池大小
+HTTP_POOL_MAXSIZE = 64
+
 class LLMService:
     """大语言模型服务类"""
     
     def __init__(self):
         self.settings = None
+        # 复用同一个会话，LLM接口和搜索API的连接可以保持复用，避免每次请求重新TLS握手
+        self.session = requests.Session()
+        # 深度研究会在多个线程里并发调用，扩大连接池避免连接被丢弃后重新握手
+        adapter = requests.adapters.HTTPAdapter(pool_connections=8, pool_maxsize=HTTP_POOL_MAXSIZE)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+    
+    def close(self):
+        """关闭会话，释放保持的长连接"""
+        self.session.close()
     
     def update_settings(self, settings):
         """更新LLM设置"""
@@ -52,7 +218,7 @@ class LLMService:
         }
         
         try:
-            response = requests.post(
+            response = self.session.post(
                 f"{test_settings.llm_base_url}/chat/completions",
                 headers=headers,
                 json=data,
@@ -105,8 +271,12 @@ class LLMService:
                 'message': f'连接测试失败: {str(e)}'
             }
     
-    def _make_request(self, messages: List[Dict], temperature: float = 0.7, stream: bool = False) -> str:
-        """发送请求到LLM服务"""
+    def _make_request(self, messages: List[Dict], temperature: float = 0.7, stream: bool = False,
+                      stop_markers: Tuple[str, ...] = (), echo: bool = True) -> str:
+        """发送请求到LLM服务
+        
+        stop_markers仅对流式请求生效：一旦输出中出现任一标记即提前结束读取
+        """
         if not self.settings or not self.settings.llm_api_key:
             raise Exception("LLM设置未配置")
         
@@ -125,9 +295,9 @@ class LLMService:
         
         try:
             if stream:
-                return self._handle_stream_request(headers, data)
+                return self._handle_stream_request(headers, data, stop_markers, echo)
             else:
-                response = requests.post(
+                response = self.session.post(
                     f"{self.settings.llm_base_url}/chat/completions",
                     headers=headers,
                     json=data,
@@ -145,12 +315,11 @@ class LLMService:
             logger.error(f"LLM请求异常: {e}")
             raise Exception(f"LLM请求异常: {e}")
     
-    def _handle_stream_request(self, headers: Dict, data: Dict) -> str:
+    def _handle_stream_request(self, headers: Dict, data: Dict,
+                               stop_markers: Tuple[str, ...] = (), echo: bool = True) -> str:
         """处理流式请求"""
-        import json
-        
         try:
-            response = requests.post(
+            response = self.session.post(
                 f"{self.settings.llm_base_url}/chat/completions",
                 headers=headers,
                 json=data,
@@ -162,7 +331,12 @@ class LLMService:
                 logger.error(f"流式LLM请求失败: {response.status_code} - {response.text}")
                 raise Exception(f"流式LLM请求失败: {response.status_code}")
             
-            content = ""
+            # 分片先收集到列表，结束后一次性拼接，避免长文本逐段拼接字符串的二次方开销
+            content_parts = []
+            # 只在末尾窗口里查找结束标记，避免每个分片都扫描全文
+            tail_size = max((len(m) for m in stop_markers), default=0)
+            tail = ''
+            stopped = False
             for line in response.iter_lines():
                 if line:
                     line_str = line.decode('utf-8')
@@ -173,17 +347,30 @@ class LLMService:
                             break
                             
                         try:
-                            chunk_data = json.loads(line_str)
+                            chunk_data = _json_loads(line_str)
                             if 'choices' in chunk_data and len(chunk_data['choices']) > 0:
                                 delta = chunk_data['choices'][0].get('delta', {})
-                                if 'content' in delta:
-                                    content += delta['content']
+                                piece = delta.get('content')
+                                if piece:
+                                    content_parts.append(piece)
                                     # 实时显示进度（可选）
-                                    print(delta['content'], end='', flush=True)
+                                    if echo:
+                                        print(piece, end='', flush=True)
+                                    if stop_markers:
+                                        window = tail + piece
+                                        if any(m in window for m in stop_markers):
+                                            stopped = True
+                                            break
+                                        tail = window[-tail_size:]
                         except json.JSONDecodeError:
                             # 忽略无法解析的行
                             continue
             
+            if stopped:
+                # 已拿到需要的内容，提前关闭连接
+                response.close()
+            
+            content = ''.join(content_parts)
             logger.info(f"流式请求完成，生成内容长度: {len(content)}")
             return content
             
@@ -322,7 +509,6 @@ class LLMService:
             result = self._make_request(messages, temperature=0.3)
             
             # 提取正则表达式（去除可能的解释文字）
-            import re
             regex_pattern = re.search(r'r?["\']([^"\']+)["\']', result)
             if regex_pattern:
                 return regex_pattern.group(1)
@@ -340,8 +526,8 @@ class LLMService:
         if not keywords.strip():
             return articles
         
-        keyword_list = [k.strip() for k in keywords.split(',') if k.strip()]
-        if not keyword_list:
+        pattern = _keyword_filter_pattern(keywords)
+        if pattern is None:
             return articles
         
         filtered_articles = []
@@ -350,16 +536,9 @@ class LLMService:
             title = article.get('title') or ''
             content = article.get('content') or ''
             
-            # 转换为小写进行匹配
-            title_lower = title.lower() if title else ''
-            content_lower = content.lower() if content else ''
-            
-            # 检查是否包含任一关键词
-            for keyword in keyword_list:
-                keyword_lower = keyword.lower()
-                if keyword_lower in title_lower or keyword_lower in content_lower:
-                    filtered_articles.append(article)
-                    break
+            # 正则本身忽略大小写，直接在原文上匹配，不再为每篇文章生成小写副本
+            if pattern.search(title) or pattern.search(content):
+                filtered_articles.append(article)
         
         return filtered_articles
     
@@ -540,15 +719,21 @@ class LLMService:
             logger.error(f"生成深度研究报告失败: {e}")
             return f"深度研究报告生成失败：{e}"
     
-    def search_web_for_topic(self, topic: str, serp_api_key: str) -> List[Dict]:
-        """使用搜索API获取主题相关信息"""
+    def search_web_for_topic(self, topic: str, serp_api_key: str, use_cache: bool = True) -> List[Dict]:
+        """使用搜索API获取主题相关信息，use_cache=False时即使开启了SERP_CACHE也直接请求API"""
         if not serp_api_key:
             logger.warning("SERP API密钥未配置，跳过网络搜索")
             return []
         
+        cache_path = None
+        if use_cache and SEARCH_CACHE_ENABLED:
+            cache_path = _search_cache_path(topic, serp_api_key)
+            cached_results = _load_cached_search(cache_path)
+            if cached_results is not None:
+                logger.info(f"命中搜索缓存: {topic}")
+                return cached_results
+        
         try:
-            import requests
-            
             logger.info(f"开始搜索主题: {topic}")
             
             # 使用SerpAPI进行搜索，匹配实际API格式
@@ -563,47 +748,16 @@ class LLMService:
                 'json_restrictor': 'organic_results[].{position,title,snippet,redirect_link,date}'
             }
             
-            response = requests.get(search_url, params=params, timeout=30)
+            response = _get_with_retry(self.session, search_url, params, timeout=30)
             
             if response.status_code == 200:
-                data = response.json()
+                data = _json_loads(response.content)
                 
-                search_results = []
-                organic_results = data.get('organic_results', [])
-                
-                for result in organic_results:
-                    # 处理redirect_link，提取真实URL
-                    url = result.get('redirect_link', '')
-                    if url and 'url=' in url:
-                        # 从Google重定向链接中提取真实URL
-                        import urllib.parse
-                        try:
-                            parsed = urllib.parse.parse_qs(urllib.parse.urlparse(url).query)
-                            if 'url' in parsed:
-                                url = parsed['url'][0]
-                        except:
-                            pass  # 如果解析失败，保持原URL
-                    
-                    # 从URL推断来源域名
-                    source = ''
-                    if url:
-                        try:
-                            from urllib.parse import urlparse
-                            parsed_url = urlparse(url)
-                            source = parsed_url.netloc
-                        except:
-                            source = url[:50] + '...' if len(url) > 50 else url
-                    
-                    search_results.append({
-                        'title': result.get('title', ''),
-                        'url': url,
-                        'snippet': result.get('snippet', ''),
-                        'source': source,
-                        'date': result.get('date', ''),
-                        'position': result.get('position', 0)
-                    })
+                search_results = parse_organic_results(data.get('organic_results', []))
                 
                 logger.info(f"搜索完成，获得 {len(search_results)} 个结果")
+                if cache_path and search_results:
+                    _store_cached_search(cache_path, search_results)
                 return search_results
             else:
                 logger.error(f"搜索API请求失败: {response.status_code}")
@@ -613,6 +767,10 @@ class LLMService:
             logger.error(f"网络搜索失败: {e}")
             return []
     
+    async def search_web_for_topic_async(self, topic: str, serp_api_key: str, use_cache: bool = True) -> List[Dict]:
+        """search_web_for_topic的异步版本，在线程中执行以免阻塞事件循环"""
+        return await asyncio.to_thread(self.search_web_for_topic, topic, serp_api_key, use_cache)
+    
     def generate_search_based_report(self, search_results: List[Dict], research_topic: str, research_focus: str) -> str:
         """基于搜索结果生成深度研究报告"""
         if not search_results:
@@ -699,4 +857,13 @@ class LLMService:
             logger.error(f"生成基于搜索的深度研究报告失败: {e}")
             return f"深度研究报告生成失败：{e}"
 
+_llm_service = None
+
+def get_llm_service() -> LLMService:
+    """获取进程内共享的LLM服务实例"""
+    global _llm_service
+    if _llm_service is None:
+        _llm_service = LLMService()
+    return _llm_service
+
 # datetime已在上面导入
@@ -8,14 +8,53 @@
 import requests
 import json
 import logging
+import re
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import Dict
+from typing import Dict, List, Tuple
 
 logger = logging.getLogger(__name__)
 
+def _keyword_pattern(keywords: List[str]) -> re.Pattern:
+    """把关键词列表编译成一个交替匹配的正则"""
+    return re.compile('|'.join(map(re.escape, keywords)))
+
+# 通用智能标注规则，按顺序匹配，命中第一条即在行尾追加对应标签
+_ANNOTATION_RULES = [
+    # 1. 数据类型标注 - 适用于任何定量研究
+    (re.compile(r'\d+[年月日]|\d{4}年|\d+月|\d+日|\d{4}-\d{2}-\d{2}'), '时间节点'),
+    (re.compile(r'\d+%|\d+倍|\d+\.\d+%|\d+比\d+|增长\d+|下降\d+'), '量化指标'),
+    (re.compile(r'\d+万|\d+亿|\d+千万|\$\d+|€\d+|￥\d+'), '规模数据'),
+    (re.compile(r'\d+篇|\d+个|\d+项|\d+轮|\d+次|\d+人|\d+家'), '统计计数'),
+    # 2. 信息性质标注 - 适用于任何信息类型
+    (_keyword_pattern(['发布', '推出', '上线', '发表', '宣布', '启动', '开始']), '发布动态'),
+    (_keyword_pattern(['突破', '创新', '首次', '新增', '升级', '改进', '优化']), '创新进展'),
+    (_keyword_pattern(['预测', '预计', '将会', '未来', '趋势', '展望', '可能']), '前瞻分析'),
+    (_keyword_pattern(['显示', '表明', '证明', '研究发现', '数据表明', '结果显示']), '研究发现'),
+    (_keyword_pattern(['优势', '特点', '特征', '功能', '性能', '能力', '特色']), '特征描述'),
+    (_keyword_pattern(['影响', '作用', '效果', '结果', '后果', '意义']), '影响评估'),
+    (_keyword_pattern(['问题', '挑战', '困难', '风险', '限制', '缺陷']), '问题识别'),
+    (_keyword_pattern(['建议', '推荐', '应该', '需要', '方案']), '策略建议'),
+    # 3. 来源可信度标注 - 适用于任何信息来源
+    (_keyword_pattern(['根据', '据', '引用', '来源于', '参考']), '引用来源'),
+    (_keyword_pattern(['官方', '权威', '专业', '学术', '科学']), '权威资料'),
+    (_keyword_pattern(['用户', '客户', '消费者', '受访者', '调研对象']), '用户观点'),
+    (_keyword_pattern(['专家', '学者', '研究员', '分析师', '权威人士']), '专家观点'),
+    # 4. 行业领域标注 - 自动识别研究领域
+    (_keyword_pattern(['技术', '科技', '算法', '系统', '平台', '工具']), '技术领域'),
+    (_keyword_pattern(['市场', '商业', '经济', '商务', '贸易', '销售']), '商业领域'),
+    (_keyword_pattern(['政策', '法规', '制度', '规定', '标准', '法律']), '政策法规'),
+    (_keyword_pattern(['社会', '文化', '教育', '健康', '环境', '生活']), '社会领域'),
+]
+
 class NotificationService:
     """通知服务类"""
     
+    def __init__(self):
+        # 复用同一个会话，保持与各推送平台的长连接，避免每次推送重新握手
+        self.session = requests.Session()
+        self.session.headers.update({'Content-Type': 'application/json'})
+    
     def send_notification(self, notification_type: str, webhook_url: str, content: str, title: str = None) -> bool:
         """发送通知"""
         try:
@@ -31,34 +70,60 @@ class NotificationService:
             logger.error(f"发送通知失败: {e}")
             return False
     
-    def _send_wechat_notification(self, webhook_url: str, content: str, title: str = None) -> bool:
-        """发送企业微信通知"""
-        try:
-            # 构建消息内容
-            if title:
-                message = f"## {title}\n\n{content}"
-            else:
-                message = content
-            
+    def send_many(self, targets: List[Tuple[str, str]], content: str, title: str = None) -> List[bool]:
+        """将同一内容推送到多个群，targets为(通知类型, Webhook URL)列表，按顺序返回各群推送结果"""
+        if not targets:
+            return []
+        
+        # 相同平台的消息体只编码一次，供该平台所有群复用
+        bodies = {}
+        for notification_type, _ in targets:
+            if notification_type not in bodies:
+                payload = self._build_payload(notification_type, content, title)
+                bodies[notification_type] = json.dumps(payload, ensure_ascii=False).encode('utf-8') if payload else None
+        
+        def send(target):
+            notification_type, webhook_url = target
+            body = bodies[notification_type]
+            if body is None:
+                logger.error(f"不支持的通知类型: {notification_type}")
+                return False
+            try:
+                return self._post_payload(notification_type, webhook_url, body)
+            except Exception as e:
+                logger.error(f"发送通知失败: {e}")
+                return False
+        
+        with ThreadPoolExecutor(max_workers=min(len(targets), 8)) as executor:
+            return list(executor.map(send, targets))
+    
+    def _build_payload(self, notification_type: str, content: str, title: str = None) -> Dict:
+        """构建各平台机器人的消息体"""
+        if notification_type == 'wechat':
             # 企业微信机器人消息格式
-            data = {
+            message = f"## {title}\n\n{content}" if title else content
+            return {
                 "msgtype": "markdown",
                 "markdown": {
                     "content": message
                 }
             }
-            
-            headers = {
-                'Content-Type': 'application/json'
+        elif notification_type == 'jinshan':
+            # 金山协作机器人消息格式（使用Markdown格式以支持更丰富的展示）
+            full_content = f"## {title}\n\n{content}" if title else content
+            return {
+                "msgtype": "markdown",
+                "markdown": {
+                    "text": full_content
+                }
             }
-            
-            response = requests.post(
-                webhook_url,
-                headers=headers,
-                json=data,
-                timeout=30
-            )
-            
+        return None
+    
+    def _post_payload(self, notification_type: str, webhook_url: str, body: bytes) -> bool:
+        """发送已编码的消息体并解析平台响应"""
+        response = self.session.post(webhook_url, data=body, timeout=30)
+        
+        if notification_type == 'wechat':
             if response.status_code == 200:
                 result = response.json()
                 if result.get('errcode') == 0:
@@ -71,6 +136,19 @@ class NotificationService:
                 logger.error(f"企业微信通知请求失败: {response.status_code}")
                 return False
         
+        if response.status_code == 200:
+            logger.info("金山协作通知发送成功")
+            return True
+        else:
+            logger.error(f"金山协作通知请求失败: {response.status_code}")
+            return False
+    
+    def _send_wechat_notification(self, webhook_url: str, content: str, title: str = None) -> bool:
+        """发送企业微信通知"""
+        try:
+            data = self._build_payload('wechat', content, title)
+            return self._post_payload('wechat', webhook_url, json.dumps(data, ensure_ascii=False).encode('utf-8'))
+        
         except Exception as e:
             logger.error(f"发送企业微信通知异常: {e}")
             return False
@@ -78,40 +156,8 @@ class NotificationService:
     def _send_jinshan_notification(self, webhook_url: str, content: str, title: str = None) -> bool:
         """发送金山协作通知"""
         try:
-            # 构建消息内容
-            message_title = title or "智能信息分析报告"
-            
-            # 如果有标题，将标题和内容组合为Markdown格式
-            if title:
-                full_content = f"## {message_title}\n\n{content}"
-            else:
-                full_content = content
-            
-            # 金山协作机器人消息格式（使用Markdown格式以支持更丰富的展示）
-            data = {
-                "msgtype": "markdown",
-                "markdown": {
-                    "text": full_content
-                }
-            }
-            
-            headers = {
-                'Content-Type': 'application/json'
-            }
-            
-            response = requests.post(
-                webhook_url,
-                headers=headers,
-                json=data,
-                timeout=30
-            )
-            
-            if response.status_code == 200:
-                logger.info("金山协作通知发送成功")
-                return True
-            else:
-                logger.error(f"金山协作通知请求失败: {response.status_code}")
-                return False
+            data = self._build_payload('jinshan', content, title)
+            return self._post_payload('jinshan', webhook_url, json.dumps(data, ensure_ascii=False).encode('utf-8'))
         
         except Exception as e:
             logger.error(f"发送金山协作通知异常: {e}")
@@ -133,49 +179,49 @@ class NotificationService:
         """格式化深度研究报告用于通知"""
         # 对于深度报告，提取关键部分发送通知
         lines = report_content.split('\n')
-        
+    
         # 提取标题和执行摘要部分
         notification_lines = []
         in_summary = False
         summary_lines = 0
-        
+    
         for line in lines:
             # 添加标题
             if line.startswith('# '):
                 notification_lines.append(line)
                 continue
-            
+        
             # 查找执行摘要部分
             if '执行摘要' in line or '摘要' in line:
                 in_summary = True
                 notification_lines.append(line)
                 continue
-            
+        
             # 在摘要部分收集内容
             if in_summary:
                 if line.startswith('#') and summary_lines > 0:
                     # 遇到下一个标题，结束摘要收集
                     break
-                
+            
                 notification_lines.append(line)
                 if line.strip():
                     summary_lines += 1
-                
+            
                 # 限制摘要长度
                 if summary_lines >= 10:
                     break
-        
+    
         # 添加查看完整报告的提示
         notification_lines.append("\n---")
         notification_lines.append("> **提示：** *这是报告摘要，完整报告请查看系统后台*")
-        
+    
         result = '\n'.join(notification_lines)
-        
+    
         # 确保不超过长度限制
         max_length = 2000
         if len(result) > max_length:
             result = result[:max_length-80] + "\n\n> **提示：** *内容已截取*"
-        
+    
         return result
     
     def _add_universal_annotations(self, line: str) -> str:
@@ -183,55 +229,9 @@ class NotificationService:
         if not line.strip():
             return line
         
-        import re
-        
-        # 1. 数据类型标注 - 适用于任何定量研究
-        if re.search(r'\d+[年月日]|\d{4}年|\d+月|\d+日|\d{4}-\d{2}-\d{2}', line):
-            return f"{line} **[时间节点]**"
-        elif re.search(r'\d+%|\d+倍|\d+\.\d+%|\d+比\d+|增长\d+|下降\d+', line):
-            return f"{line} **[量化指标]**"
-        elif re.search(r'\d+万|\d+亿|\d+千万|\$\d+|€\d+|￥\d+', line):
-            return f"{line} **[规模数据]**"
-        elif re.search(r'\d+篇|\d+个|\d+项|\d+轮|\d+次|\d+人|\d+家', line):
-            return f"{line} **[统计计数]**"
-        
-        # 2. 信息性质标注 - 适用于任何信息类型
-        elif any(keyword in line for keyword in ['发布', '推出', '上线', '发表', '宣布', '启动', '开始']):
-            return f"{line} **[发布动态]**"
-        elif any(keyword in line for keyword in ['突破', '创新', '首次', '新增', '升级', '改进', '优化']):
-            return f"{line} **[创新进展]**"
-        elif any(keyword in line for keyword in ['预测', '预计', '将会', '未来', '趋势', '展望', '可能']):
-            return f"{line} **[前瞻分析]**"
-        elif any(keyword in line for keyword in ['显示', '表明', '证明', '研究发现', '数据表明', '结果显示']):
-            return f"{line} **[研究发现]**"
-        elif any(keyword in line for keyword in ['优势', '特点', '特征', '功能', '性能', '能力', '特色']):
-            return f"{line} **[特征描述]**"
-        elif any(keyword in line for keyword in ['影响', '作用', '效果', '结果', '后果', '意义']):
-            return f"{line} **[影响评估]**"
-        elif any(keyword in line for keyword in ['问题', '挑战', '困难', '风险', '限制', '缺陷']):
-            return f"{line} **[问题识别]**"
-        elif any(keyword in line for keyword in ['建议', '推荐', '应该', '需要', '建议', '方案']):
-            return f"{line} **[策略建议]**"
-        
-        # 3. 来源可信度标注 - 适用于任何信息来源
-        elif any(keyword in line for keyword in ['根据', '据', '引用', '来源于', '参考']):
-            return f"{line} **[引用来源]**"
-        elif any(keyword in line for keyword in ['官方', '权威', '专业', '学术', '科学']):
-            return f"{line} **[权威资料]**"
-        elif any(keyword in line for keyword in ['用户', '客户', '消费者', '受访者', '调研对象']):
-            return f"{line} **[用户观点]**"
-        elif any(keyword in line for keyword in ['专家', '学者', '研究员', '分析师', '权威人士']):
-            return f"{line} **[专家观点]**"
-        
-        # 4. 行业领域标注 - 自动识别研究领域
-        elif any(keyword in line for keyword in ['技术', '科技', '算法', '系统', '平台', '工具']):
-            return f"{line} **[技术领域]**"
-        elif any(keyword in line for keyword in ['市场', '商业', '经济', '商务', '贸易', '销售']):
-            return f"{line} **[商业领域]**"
-        elif any(keyword in line for keyword in ['政策', '法规', '制度', '规定', '标准', '法律']):
-            return f"{line} **[政策法规]**"
-        elif any(keyword in line for keyword in ['社会', '文化', '教育', '健康', '环境', '生活']):
-            return f"{line} **[社会领域]**"
+        for pattern, tag in _ANNOTATION_RULES:
+            if pattern.search(line):
+                return f"{line} **[{tag}]**"
         
         # 默认返回原始行
         return line
@@ -278,3 +278,13 @@ class NotificationService:
                 'success': False,
                 'message': f'测试失败: {str(e)}'
             }
+
+
+_notification_service = None
+
+def get_notification_service() -> NotificationService:
+    """获取进程内共享的通知服务实例（复用同一个HTTP会话）"""
+    global _notification_service
+    if _notification_service is None:
+        _notification_service = NotificationService()
+    return _notification_service
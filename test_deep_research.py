@@ -11,117 +11,160 @@ import os
 import json
 from datetime import datetime, timedelta
 
+# 可选使用uvloop事件循环（Windows等不支持的环境自动回退到默认事件循环）
+try:
+    import uvloop
+    # uvloop.run 从0.18开始提供，旧版本按不可用处理
+    UVLOOP_AVAILABLE = hasattr(uvloop, 'run')
+except ImportError:
+    UVLOOP_AVAILABLE = False
+
 # 添加项目根目录到Python路径
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
+# 设置 FAKE_LLM=1 时不调用真实LLM，使用已录制的深度研究报告，只验证过滤、格式化、入库等流程
+FAKE_LLM = os.getenv('FAKE_LLM') == '1'
+FAKE_REPORT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'latest_deep_research_report.md')
+
 from app import app, db
 from models import GlobalSettings, CrawlerConfig, ReportConfig, CrawlRecord, ReportRecord
 from services.crawler_service import CrawlerService
-from services.llm_service import LLMService
-from services.notification_service import NotificationService
+from services.llm_service import LLMService, get_llm_service
+from services.notification_service import get_notification_service
 
 class DeepResearchTester:
     """深度研究测试类"""
     
     def __init__(self):
         self.crawler_service = CrawlerService()
-        self.llm_service = LLMService()
-        self.notification_service = NotificationService()
+        # FAKE_LLM模式下使用测试自己的LLM服务实例，替换的方法不会影响共享实例的其他使用方
+        self.llm_service = LLMService() if FAKE_LLM else get_llm_service()
+        self.notification_service = get_notification_service()
         self.settings = None
+        self.crawlers_by_id = {}
+        self.llm_probe = None
         
     def setup(self):
         """初始化测试环境"""
         print("🔧 初始化测试环境...")
         
-        with app.app_context():
-            # 获取全局设置
-            self.settings = GlobalSettings.query.first()
-            if not self.settings:
-                print("❌ 未找到全局设置，请先配置系统")
-                return False
-            
-            # 更新LLM服务设置
-            self.llm_service.update_settings(self.settings)
-            
-            print(f"✅ 已加载配置:")
-            print(f"   LLM Provider: {self.settings.llm_provider}")
-            print(f"   LLM Model: {self.settings.llm_model_name}")
-            print(f"   API Key: {'已配置' if self.settings.llm_api_key else '未配置'}")
-            print(f"   SERP API: {'已配置' if self.settings.serp_api_key else '未配置'}")
-            
-            return True
+        # 获取全局设置
+        self.settings = GlobalSettings.query.first()
+        if not self.settings:
+            print("❌ 未找到全局设置，请先配置系统")
+            return False
+        
+        # 更新LLM服务设置
+        self.llm_service.update_settings(self.settings)
+        
+        if FAKE_LLM:
+            self._use_fake_llm()
+        
+        # 提前在后台发起LLM连接测试，等到LLM测试阶段再取结果，网络等待与爬虫测试重叠
+        self.llm_probe = asyncio.ensure_future(asyncio.to_thread(self.llm_service.test_connection))
+        
+        # 一次性加载全部爬虫配置，后续按ID直接查表
+        self.crawlers_by_id = {crawler.id: crawler for crawler in CrawlerConfig.query.all()}
+        
+        print(f"✅ 已加载配置:")
+        print(f"   LLM Provider: {self.settings.llm_provider}")
+        print(f"   LLM Model: {self.settings.llm_model_name}")
+        print(f"   API Key: {'已配置' if self.settings.llm_api_key else '未配置'}")
+        print(f"   SERP API: {'已配置' if self.settings.serp_api_key else '未配置'}")
+        
+        return True
+    
+    async def teardown(self):
+        """回收后台LLM连接测试：LLM测试阶段未取用时取消并读取其结果，避免异常无人处理"""
+        if self.llm_probe is not None:
+            if not self.llm_probe.done():
+                self.llm_probe.cancel()
+            await asyncio.gather(self.llm_probe, return_exceptions=True)
+            self.llm_probe = None
+        # 私有的LLM服务实例由测试负责关闭，共享实例保持不动
+        if FAKE_LLM:
+            self.llm_service.close()
+    
+    def _use_fake_llm(self):
+        """用录制的报告替换LLM调用（只替换本测试私有的LLM服务实例上的方法）"""
+        with open(FAKE_REPORT_PATH, 'r', encoding='utf-8') as f:
+            fake_report = f.read()
+        
+        self.llm_service.test_connection = lambda settings=None: {'success': True, 'message': 'FAKE_LLM模式，未调用真实LLM'}
+        self.llm_service.generate_deep_research_report = lambda articles, report_config: fake_report
+        self.llm_service.generate_simple_report = lambda articles, report_config: fake_report
+        print(f"🧪 FAKE_LLM模式: 使用录制报告 {os.path.basename(FAKE_REPORT_PATH)}")
     
     async def test_crawler_service(self):
         """测试爬虫服务"""
         print("\n🕷️ 测试爬虫服务...")
         
-        with app.app_context():
-            # 获取一个激活的爬虫配置
-            crawler = CrawlerConfig.query.filter_by(is_active=True).first()
-            if not crawler:
-                print("❌ 未找到激活的爬虫配置")
+        # 获取一个激活的爬虫配置
+        crawler = CrawlerConfig.query.filter_by(is_active=True).first()
+        if not crawler:
+            print("❌ 未找到激活的爬虫配置")
+            return False, []
+        
+        print(f"📰 使用爬虫: {crawler.name}")
+        print(f"   列表页URL: {crawler.list_url}")
+        print(f"   正则表达式: {crawler.url_regex}")
+        
+        try:
+            # 测试连接
+            print("🔗 测试连接...")
+            connection_result = await self.crawler_service.test_connection(crawler.list_url)
+            if not connection_result['success']:
+                print(f"❌ 连接测试失败: {connection_result['error']}")
                 return False, []
             
-            print(f"📰 使用爬虫: {crawler.name}")
-            print(f"   列表页URL: {crawler.list_url}")
-            print(f"   正则表达式: {crawler.url_regex}")
+            print(f"✅ 连接成功，页面标题: {connection_result.get('title', 'N/A')}")
             
-            try:
-                # 测试连接
-                print("🔗 测试连接...")
-                connection_result = await self.crawler_service.test_connection(crawler.list_url)
-                if not connection_result['success']:
-                    print(f"❌ 连接测试失败: {connection_result['error']}")
-                    return False, []
-                
-                print(f"✅ 连接成功，页面标题: {connection_result.get('title', 'N/A')}")
-                
-                # 提取URL列表
-                print("🔍 提取URL列表...")
-                urls = await self.crawler_service.extract_urls_from_page(
-                    crawler.list_url, 
-                    crawler.url_regex
-                )
-                
-                if not urls:
-                    print("❌ 未提取到任何URL")
-                    return False, []
-                
-                print(f"✅ 提取到 {len(urls)} 个URL")
-                print(f"   前3个URL: {urls[:3]}")
-                
-                # 抓取文章内容（测试前5篇）
-                print("📄 抓取文章内容...")
-                articles = []
-                test_urls = urls[:5]  # 只测试前5个URL
-                
-                for i, url in enumerate(test_urls, 1):
-                    print(f"   正在抓取 {i}/{len(test_urls)}: {url}")
-                    result = await self.crawler_service.crawl_article_content(url)
-                    
-                    if result['success']:
-                        articles.append({
-                            'title': result['title'],
-                            'content': result['content'],
-                            'author': result.get('author', ''),
-                            'url': result['url'],
-                            'date': result.get('date', '')
-                        })
-                        print(f"     ✅ 成功: {result['title'][:50]}...")
-                    else:
-                        print(f"     ❌ 失败: {result['error']}")
-                    
-                    # 添加延迟避免被封
-                    await asyncio.sleep(1)
+            # 提取URL列表
+            print("🔍 提取URL列表...")
+            urls = await self.crawler_service.extract_urls_from_page(
+                crawler.list_url, 
+                crawler.url_regex
+            )
+            
+            if not urls:
+                print("❌ 未提取到任何URL")
+                return False, []
+            
+            print(f"✅ 提取到 {len(urls)} 个URL")
+            print(f"   前3个URL: {urls[:3]}")
+            
+            # 抓取文章内容（测试前5篇）
+            print("📄 抓取文章内容...")
+            articles = []
+            test_urls = urls[:5]  # 只测试前5个URL
+            
+            for i, url in enumerate(test_urls, 1):
+                print(f"   正在抓取 {i}/{len(test_urls)}: {url}")
+                result = await self.crawler_service.crawl_article_content(url)
                 
-                print(f"✅ 爬虫测试完成，成功抓取 {len(articles)} 篇文章")
-                return True, articles
+                if result['success']:
+                    articles.append({
+                        'title': result['title'],
+                        'content': result['content'],
+                        'author': result.get('author', ''),
+                        'url': result['url'],
+                        'date': result.get('date', '')
+                    })
+                    print(f"     ✅ 成功: {result['title'][:50]}...")
+                else:
+                    print(f"     ❌ 失败: {result['error']}")
                 
-            except Exception as e:
-                print(f"❌ 爬虫测试失败: {e}")
-                return False, []
+                # 添加延迟避免被封
+                await asyncio.sleep(1)
+            
+            print(f"✅ 爬虫测试完成，成功抓取 {len(articles)} 篇文章")
+            return True, articles
+            
+        except Exception as e:
+            print(f"❌ 爬虫测试失败: {e}")
+            return False, []
     
-    def test_llm_service(self, articles):
+    async def test_llm_service(self, articles):
         """测试LLM服务"""
         print("\n🤖 测试LLM服务...")
         
@@ -132,7 +175,7 @@ class DeepResearchTester:
         try:
             # 测试连接
             print("🔗 测试LLM连接...")
-            connection_result = self.llm_service.test_connection()
+            connection_result = await self.llm_probe
             if not connection_result['success']:
                 print(f"❌ LLM连接失败: {connection_result['message']}")
                 return False, None
@@ -146,15 +189,14 @@ class DeepResearchTester:
             print(f"✅ 关键词过滤完成，原文章数: {len(articles)}, 过滤后: {len(filtered_articles)}")
             
             # 创建测试报告配置
-            with app.app_context():
-                test_report_config = type('TestReportConfig', (), {
-                    'name': '深度研究测试报告',
-                    'purpose': '测试深度研究功能的完整性和准确性',
-                    'research_focus': '分析当前科技发展趋势，特别关注AI技术的最新进展和应用场景',
-                    'data_sources': '1,2,3',
-                    'filter_keywords': test_keywords,
-                    'time_range': '24h'
-                })()
+            test_report_config = type('TestReportConfig', (), {
+                'name': '深度研究测试报告',
+                'purpose': '测试深度研究功能的完整性和准确性',
+                'research_focus': '分析当前科技发展趋势，特别关注AI技术的最新进展和应用场景',
+                'data_sources': '1,2,3',
+                'filter_keywords': test_keywords,
+                'time_range': '24h'
+            })()
             
             # 测试深度研究报告生成
             print("📊 生成深度研究报告...")
@@ -227,109 +269,114 @@ class DeepResearchTester:
         """测试端到端工作流程"""
         print("\n🔄 测试端到端工作流程...")
         
-        with app.app_context():
-            try:
-                # 获取深度研究报告配置
-                deep_report = ReportConfig.query.filter_by(enable_deep_research=True).first()
-                if not deep_report:
-                    print("❌ 未找到深度研究报告配置")
-                    return False
-                
-                print(f"📊 使用报告配置: {deep_report.name}")
-                print(f"   研究重点: {deep_report.research_focus}")
-                print(f"   数据源: {deep_report.data_sources}")
-                
-                # 获取数据源爬虫
-                crawler_ids = [int(x) for x in deep_report.data_sources.split(',') if x.strip()]
-                print(f"🕷️ 数据源爬虫ID: {crawler_ids}")
-                
-                # 模拟获取最近的爬取数据
-                articles = []
-                for crawler_id in crawler_ids[:2]:  # 只测试前2个数据源
-                    crawler = CrawlerConfig.query.get(crawler_id)
-                    if crawler:
-                        print(f"   从爬虫 '{crawler.name}' 获取数据...")
-                        
-                        # 检查是否有历史数据
-                        records = CrawlRecord.query.filter_by(
-                            crawler_config_id=crawler_id,
-                            status='success'
-                        ).order_by(CrawlRecord.crawled_at.desc()).limit(5).all()
-                        
-                        if records:
-                            print(f"     找到 {len(records)} 条历史记录")
-                            for record in records:
+        try:
+            # 获取深度研究报告配置
+            deep_report = ReportConfig.query.filter_by(enable_deep_research=True).first()
+            if not deep_report:
+                print("❌ 未找到深度研究报告配置")
+                return False
+            
+            print(f"📊 使用报告配置: {deep_report.name}")
+            print(f"   研究重点: {deep_report.research_focus}")
+            print(f"   数据源: {deep_report.data_sources}")
+            
+            # 获取数据源爬虫
+            crawler_ids = list(map(int, filter(None, map(str.strip, deep_report.data_sources.split(',')))))
+            print(f"🕷️ 数据源爬虫ID: {crawler_ids}")
+            
+            # 模拟获取最近的爬取数据
+            articles = []
+            for crawler_id in crawler_ids[:2]:  # 只测试前2个数据源
+                crawler = self.crawlers_by_id.get(crawler_id)
+                if crawler:
+                    print(f"   从爬虫 '{crawler.name}' 获取数据...")
+                    
+                    # 检查是否有历史数据（只查询需要的列，避免加载完整ORM对象）
+                    records = db.session.query(
+                        CrawlRecord.title,
+                        CrawlRecord.content,
+                        CrawlRecord.author,
+                        CrawlRecord.url,
+                        CrawlRecord.publish_date
+                    ).filter_by(
+                        crawler_config_id=crawler_id,
+                        status='success'
+                    ).order_by(CrawlRecord.crawled_at.desc()).limit(5).all()
+                    
+                    if records:
+                        print(f"     找到 {len(records)} 条历史记录")
+                        for title, content, author, url, publish_date in records:
+                            articles.append({
+                                'title': title,
+                                'content': content,
+                                'author': author,
+                                'url': url,
+                                'date': publish_date.isoformat() if publish_date else ''
+                            })
+                    else:
+                        print(f"     没有历史记录，执行实时抓取...")
+                        # 实时抓取少量数据
+                        results = await self.crawler_service.run_crawler_task(crawler)
+                        for result in results[:3]:  # 只取前3篇
+                            if result['success']:
                                 articles.append({
-                                    'title': record.title,
-                                    'content': record.content,
-                                    'author': record.author,
-                                    'url': record.url,
-                                    'date': record.publish_date.isoformat() if record.publish_date else ''
+                                    'title': result['title'],
+                                    'content': result['content'],
+                                    'author': result.get('author', ''),
+                                    'url': result['url'],
+                                    'date': result.get('date', '')
                                 })
-                        else:
-                            print(f"     没有历史记录，执行实时抓取...")
-                            # 实时抓取少量数据
-                            results = await self.crawler_service.run_crawler_task(crawler)
-                            for result in results[:3]:  # 只取前3篇
-                                if result['success']:
-                                    articles.append({
-                                        'title': result['title'],
-                                        'content': result['content'],
-                                        'author': result.get('author', ''),
-                                        'url': result['url'],
-                                        'date': result.get('date', '')
-                                    })
-                
-                if not articles:
-                    print("❌ 未获取到任何文章数据")
-                    return False
+            
+            if not articles:
+                print("❌ 未获取到任何文章数据")
+                return False
+            
+            print(f"✅ 共获取到 {len(articles)} 篇文章")
+            
+            # 过滤文章
+            if deep_report.filter_keywords:
+                print(f"🔍 应用关键词过滤: {deep_report.filter_keywords}")
+                articles = self.llm_service.filter_articles_by_keywords(
+                    articles, 
+                    deep_report.filter_keywords
+                )
+                print(f"   过滤后文章数: {len(articles)}")
+            
+            # 生成深度研究报告
+            print("📊 生成深度研究报告...")
+            report_content = self.llm_service.generate_deep_research_report(articles, deep_report)
+            
+            if report_content and len(report_content) > 100:
+                print(f"✅ 深度研究报告生成成功，长度: {len(report_content)} 字符")
                 
-                print(f"✅ 共获取到 {len(articles)} 篇文章")
+                # 保存报告记录（测试用）
+                test_record = ReportRecord(
+                    report_config_id=deep_report.id,
+                    title=f"{deep_report.name} - 测试报告 - {datetime.now().strftime('%Y-%m-%d %H:%M')}",
+                    content=report_content,
+                    summary=report_content[:200] + '...' if len(report_content) > 200 else report_content,
+                    status='success'
+                )
+                db.session.add(test_record)
+                db.session.commit()
                 
-                # 过滤文章
-                if deep_report.filter_keywords:
-                    print(f"🔍 应用关键词过滤: {deep_report.filter_keywords}")
-                    articles = self.llm_service.filter_articles_by_keywords(
-                        articles, 
-                        deep_report.filter_keywords
-                    )
-                    print(f"   过滤后文章数: {len(articles)}")
+                print(f"✅ 测试报告已保存到数据库，ID: {test_record.id}")
                 
-                # 生成深度研究报告
-                print("📊 生成深度研究报告...")
-                report_content = self.llm_service.generate_deep_research_report(articles, deep_report)
+                # 格式化通知内容
+                print("📱 格式化通知内容...")
+                notification_content = self.notification_service.format_deep_research_for_notification(
+                    report_content
+                )
+                print(f"✅ 通知内容格式化完成，长度: {len(notification_content)} 字符")
                 
-                if report_content and len(report_content) > 100:
-                    print(f"✅ 深度研究报告生成成功，长度: {len(report_content)} 字符")
-                    
-                    # 保存报告记录（测试用）
-                    test_record = ReportRecord(
-                        report_config_id=deep_report.id,
-                        title=f"{deep_report.name} - 测试报告 - {datetime.now().strftime('%Y-%m-%d %H:%M')}",
-                        content=report_content,
-                        summary=report_content[:200] + '...' if len(report_content) > 200 else report_content,
-                        status='success'
-                    )
-                    db.session.add(test_record)
-                    db.session.commit()
-                    
-                    print(f"✅ 测试报告已保存到数据库，ID: {test_record.id}")
-                    
-                    # 格式化通知内容
-                    print("📱 格式化通知内容...")
-                    notification_content = self.notification_service.format_deep_research_for_notification(
-                        report_content
-                    )
-                    print(f"✅ 通知内容格式化完成，长度: {len(notification_content)} 字符")
-                    
-                    return True
-                else:
-                    print("❌ 深度研究报告生成失败")
-                    return False
-                    
-            except Exception as e:
-                print(f"❌ 端到端测试失败: {e}")
+                return True
+            else:
+                print("❌ 深度研究报告生成失败")
                 return False
+                
+        except Exception as e:
+            print(f"❌ 端到端测试失败: {e}")
+            return False
     
     def generate_test_report(self, results):
         """生成测试报告"""
@@ -357,13 +404,8 @@ class DeepResearchTester:
             print("⚠️ 部分测试失败，请检查相关配置和服务")
             return False
 
-async def main():
-    """主测试函数"""
-    print("🧪 开始深度研究功能测试")
-    print("="*60)
-    
-    tester = DeepResearchTester()
-    
+async def run_all_tests(tester):
+    """在同一个应用上下文中依次执行各项测试"""
     # 初始化
     if not tester.setup():
         print("❌ 测试环境初始化失败")
@@ -377,7 +419,7 @@ async def main():
         results["爬虫服务"] = crawler_success
         
         # 测试LLM服务
-        llm_success, report_data = tester.test_llm_service(articles)
+        llm_success, report_data = await tester.test_llm_service(articles)
         results["LLM服务"] = llm_success
         
         # 测试通知服务
@@ -398,10 +440,26 @@ async def main():
         import traceback
         traceback.print_exc()
         return False
+    finally:
+        await tester.teardown()
+
+async def main():
+    """主测试函数"""
+    print("🧪 开始深度研究功能测试")
+    print("="*60)
+    
+    tester = DeepResearchTester()
+    
+    # 整个测试过程只进入一次应用上下文，各阶段共享同一个数据库会话
+    with app.app_context():
+        return await run_all_tests(tester)
 
 if __name__ == "__main__":
     print("🚀 启动深度研究功能测试...")
-    success = asyncio.run(main())
+    if UVLOOP_AVAILABLE:
+        success = uvloop.run(main())
+    else:
+        success = asyncio.run(main())
     
     if success:
         print("\n🎊 测试完成！系统深度研究功能正常运行")
@@ -9,224 +9,65 @@ import asyncio
 import sys
 import os
 import json
+import logging
+import queue
+import re
 from datetime import datetime
+from string import Template
+from types import SimpleNamespace
+from logging.handlers import QueueHandler, QueueListener, MemoryHandler
+
+# 可选使用uvloop事件循环（Windows等不支持的环境自动回退到默认事件循环）
+try:
+    import uvloop
+    # uvloop.run 从0.18开始提供，旧版本按不可用处理
+    UVLOOP_AVAILABLE = hasattr(uvloop, 'run')
+except ImportError:
+    UVLOOP_AVAILABLE = False
 
 # 添加项目根目录到Python路径
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 from app import app, db
 from models import GlobalSettings, ReportConfig, ReportRecord
-from services.notification_service import NotificationService
+from services.notification_service import get_notification_service
 
-class GroupNotificationTester:
-    """群推送测试类"""
-    
-    def __init__(self):
-        self.notification_service = NotificationService()
-        self.settings = None
-        
-    def setup(self):
-        """初始化测试环境"""
-        print("🔧 初始化群推送测试环境...")
-        
-        with app.app_context():
-            # 获取全局设置
-            self.settings = GlobalSettings.query.first()
-            if not self.settings:
-                print("❌ 未找到全局设置")
-                return False
-            
-            print("✅ 测试环境初始化完成")
-            return True
-    
-    def display_full_report(self):
-        """展示完整的深度研究报告"""
-        print("\n" + "="*80)
-        print("📊 **完整深度研究报告展示**")
-        print("="*80)
-        
-        with app.app_context():
-            # 获取最新的深度研究报告
-            latest_report = ReportRecord.query.order_by(ReportRecord.generated_at.desc()).first()
-            
-            if not latest_report:
-                print("❌ 未找到深度研究报告")
-                return False
-            
-            print(f"📋 **报告标题：** {latest_report.title}")
-            print(f"🕐 **生成时间：** {latest_report.generated_at.strftime('%Y-%m-%d %H:%M:%S')}")
-            print(f"📄 **报告长度：** {len(latest_report.content)} 字符")
-            print(f"✅ **状态：** {latest_report.status}")
-            
-            print("\n" + "-"*80)
-            print("📖 **完整报告内容：**")
-            print("-"*80)
-            
-            # 分段显示报告内容，增加可读性
-            content_lines = latest_report.content.split('\n')
-            for i, line in enumerate(content_lines):
-                if line.strip():
-                    # 为标题添加颜色和格式
-                    if line.startswith('# '):
-                        print(f"\n🎯 {line}")
-                    elif line.startswith('## '):
-                        print(f"\n📌 {line}")
-                    elif line.startswith('### '):
-                        print(f"\n📍 {line}")
-                    elif line.startswith('**') and line.endswith('**'):
-                        print(f"💡 {line}")
-                    elif line.startswith('- '):
-                        print(f"  {line}")
-                    elif line.startswith('|'):
-                        print(f"📊 {line}")
-                    else:
-                        print(line)
-                else:
-                    print()
-            
-            print("\n" + "="*80)
-            print("✅ **报告展示完成**")
-            print("="*80)
-            
-            return True
-    
-    def test_notification_formatting(self):
-        """测试通知格式化"""
-        print("\n📱 测试通知格式化...")
-        
-        with app.app_context():
-            latest_report = ReportRecord.query.order_by(ReportRecord.generated_at.desc()).first()
-            
-            if not latest_report:
-                print("❌ 未找到报告数据")
-                return False
-            
-            # 测试深度研究报告格式化
-            print("📝 格式化深度研究报告通知...")
-            formatted_notification = self.notification_service.format_deep_research_for_notification(
-                latest_report.content
-            )
-            
-            print(f"✅ 通知格式化完成，长度: {len(formatted_notification)} 字符")
-            print("\n" + "-"*60)
-            print("📲 **格式化后的通知内容：**")
-            print("-"*60)
-            print(formatted_notification)
-            print("-"*60)
-            
-            return formatted_notification
-    
-    def test_webhook_with_real_content(self, formatted_content):
-        """使用真实内容测试Webhook"""
-        print("\n🔗 测试实际Webhook推送...")
-        
-        with app.app_context():
-            # 获取报告配置中的Webhook URL
-            report_configs = ReportConfig.query.filter(
-                ReportConfig.webhook_url.isnot(None),
-                ReportConfig.webhook_url != ''
-            ).all()
-            
-            if not report_configs:
-                print("⚠️ 未找到配置的Webhook URL，使用测试URL")
-                test_urls = [
-                    {
-                        'type': 'wechat',
-                        'url': 'https://qyapi.weixin.qq.com/cgi-bin/webhook/send?key=test-key',
-                        'name': '企业微信测试群'
-                    },
-                    {
-                        'type': 'jinshan',
-                        'url': 'https://open.feishu.cn/open-apis/bot/v2/hook/test-hook',
-                        'name': '飞书测试群'
-                    }
-                ]
-            else:
-                test_urls = []
-                for config in report_configs:
-                    test_urls.append({
-                        'type': config.notification_type,
-                        'url': config.webhook_url,
-                        'name': f'{config.name}的通知群'
-                    })
-            
-            results = []
-            
-            for webhook_config in test_urls:
-                print(f"\n📤 推送到 {webhook_config['name']} ({webhook_config['type']})...")
-                print(f"   URL: {webhook_config['url'][:50]}...")
-                
-                # 发送实际通知
-                success = self.notification_service.send_notification(
-                    webhook_config['type'],
-                    webhook_config['url'],
-                    formatted_content,
-                    "🤖 深度研究报告 - 测试推送"
-                )
-                
-                if success:
-                    print(f"   ✅ 推送成功！")
-                    results.append(True)
-                else:
-                    print(f"   ❌ 推送失败（可能是测试URL或网络问题）")
-                    results.append(False)
-                
-                # 测试连接性
-                test_result = self.notification_service.test_webhook(
-                    webhook_config['type'],
-                    webhook_config['url']
-                )
-                
-                if test_result['success']:
-                    print(f"   🔗 连接测试: ✅ 成功")
-                else:
-                    print(f"   🔗 连接测试: ❌ {test_result['message']}")
-            
-            return any(results)
-    
-    def simulate_real_group_push(self):
-        """模拟真实的群推送场景"""
-        print("\n🎭 模拟真实群推送场景...")
-        
-        # 模拟不同类型的群推送
-        scenarios = [
-            {
-                'name': '技术团队群',
-                'type': 'wechat',
-                'focus': '技术细节和实现方案',
-                'audience': '开发者和技术专家'
-            },
-            {
-                'name': '管理层决策群',
-                'type': 'jinshan',
-                'focus': '战略洞察和商业影响',
-                'audience': '高管和决策者'
-            },
-            {
-                'name': '产品运营群',
-                'type': 'wechat',
-                'focus': '市场趋势和用户影响',
-                'audience': '产品经理和运营人员'
-            }
-        ]
-        
-        with app.app_context():
-            latest_report = ReportRecord.query.order_by(ReportRecord.generated_at.desc()).first()
-            
-            if not latest_report:
-                print("❌ 未找到报告数据")
-                return False
-            
-            for scenario in scenarios:
-                print(f"\n📱 推送到 **{scenario['name']}**")
-                print(f"   👥 目标受众: {scenario['audience']}")
-                print(f"   🎯 关注重点: {scenario['focus']}")
-                print(f"   📢 推送平台: {scenario['type']}")
-                
-                # 根据不同受众定制通知内容
-                if scenario['focus'] == '技术细节和实现方案':
-                    # 技术团队关注实现细节
-                    custom_content = f"""🤖 **AI技术深度研究报告**
+# 测试输出经日志队列交给后台线程，缓冲满100条或每个测试阶段结束时批量写出
+log = logging.getLogger("alice.tests")
+log.setLevel(logging.INFO)
+log.propagate = False
+_log_queue = queue.Queue(-1)
+_stdout_handler = logging.StreamHandler(sys.stdout)
+_stdout_handler.setFormatter(logging.Formatter("%(message)s"))
+_buffer_handler = MemoryHandler(capacity=100, flushLevel=logging.ERROR, target=_stdout_handler)
+log.addHandler(QueueHandler(_log_queue))
+log_listener = QueueListener(_log_queue, _buffer_handler)
+
+def flush_log():
+    """等待队列中的日志处理完毕并立即写出缓冲内容"""
+    log_listener.stop()
+    _buffer_handler.flush()
+    log_listener.start()
+
+# 报告展示时各类Markdown行的分类规则（一次正则匹配完成分类）及对应的前缀修饰
+LINE_PATTERN = re.compile(
+    r'(?P<bold>(?=\*\*)(?=.*\*\*$))'
+    r'|(?P<h1># )|(?P<h2>## )|(?P<h3>### )'
+    r'|(?P<item>- )|(?P<table>\|)'
+)
+LINE_DECORATIONS = {
+    'bold': '💡 ',
+    'h1': '\n🎯 ',
+    'h2': '\n📌 ',
+    'h3': '\n📍 ',
+    'item': '  ',
+    'table': '📊 ',
+}
+
+# 不同受众的群推送内容模板（按关注重点区分），$ts 为推送时间
+
+# 技术团队关注实现细节
+TECH_PUSH_TEMPLATE = Template("""🤖 **AI技术深度研究报告**
 
 📊 **核心技术洞察：**
 • AI基础设施投资成为新热点
@@ -244,13 +85,12 @@ class GroupNotificationTester:
 • 构建自主可控技术体系
 
 📈 **数据来源：** 基于4篇最新技术文章分析
-🕐 **生成时间：** {datetime.now().strftime('%Y-%m-%d %H:%M')}
+🕐 **生成时间：** $ts
 
-> 完整技术报告请查看系统后台"""
+> 完整技术报告请查看系统后台""")
 
-                elif scenario['focus'] == '战略洞察和商业影响':
-                    # 管理层关注战略和商业价值
-                    custom_content = f"""📊 **AI战略研究报告 - 管理层摘要**
+# 管理层关注战略和商业价值
+MANAGEMENT_PUSH_TEMPLATE = Template("""📊 **AI战略研究报告 - 管理层摘要**
 
 🎯 **战略要点：**
 • AI竞争已进入生态构建新阶段
@@ -272,13 +112,12 @@ class GroupNotificationTester:
 • 强化核心技术自主研发
 • 完善AI人才引进与培养
 
-🕐 **报告时间：** {datetime.now().strftime('%Y-%m-%d %H:%M')}
+🕐 **报告时间：** $ts
 
-> 详细战略分析请查看完整报告"""
+> 详细战略分析请查看完整报告""")
 
-                else:
-                    # 产品运营关注市场和用户
-                    custom_content = f"""📱 **AI市场趋势报告**
+# 产品运营关注市场和用户
+PRODUCT_PUSH_TEMPLATE = Template("""📱 **AI市场趋势报告**
 
 🌟 **市场亮点：**
 • 网络文明建设推动AI向善发展
@@ -300,40 +139,272 @@ class GroupNotificationTester:
 • 优化用户体验和易用性
 • 构建开放协作生态
 
-🕐 **更新时间：** {datetime.now().strftime('%Y-%m-%d %H:%M')}
+🕐 **更新时间：** $ts
+
+> 完整市场分析请查看系统后台""")
 
-> 完整市场分析请查看系统后台"""
-                
-                # 模拟发送（实际环境中会调用真实API）
-                print(f"   📤 推送内容预览:")
-                print("   " + "-"*50)
-                for line in custom_content.split('\n')[:10]:
-                    print(f"   {line}")
-                print("   ...")
-                print("   " + "-"*50)
-                print(f"   ✅ 模拟推送完成")
+PUSH_TEMPLATES = {
+    '技术细节和实现方案': TECH_PUSH_TEMPLATE,
+    '战略洞察和商业影响': MANAGEMENT_PUSH_TEMPLATE,
+    '市场趋势和用户影响': PRODUCT_PUSH_TEMPLATE,
+}
+
+class GroupNotificationTester:
+    """群推送测试类"""
+    
+    def __init__(self):
+        self.notification_service = get_notification_service()
+        self.settings = None
+        self.latest_report = None
+        self.report_view = None
+        self.webhook_targets = []
+        self.webhook_probes = []
+        
+    def setup(self):
+        """初始化测试环境"""
+        log.info("🔧 初始化群推送测试环境...")
+        
+        # 获取全局设置
+        self.settings = GlobalSettings.query.first()
+        if not self.settings:
+            log.info("❌ 未找到全局设置")
+            return False
+        
+        # 获取最新的深度研究报告，供后续各阶段共用
+        self.latest_report = ReportRecord.query.order_by(ReportRecord.generated_at.desc()).first()
+        if self.latest_report:
+            # 报告内容的派生值只计算一次，各阶段直接复用
+            content = self.latest_report.content or ''
+            self.report_view = SimpleNamespace(
+                content=content,
+                length=len(content),
+                lines=content.split('\n')
+            )
+        
+        # 提前在后台发起各群的连接测试，到Webhook推送阶段再取结果
+        self.webhook_targets = self._load_webhook_targets()
+        self.webhook_probes = [
+            asyncio.ensure_future(
+                asyncio.to_thread(self.notification_service.test_webhook, c['type'], c['url'])
+            )
+            for c in self.webhook_targets
+        ]
         
+        log.info("✅ 测试环境初始化完成")
         return True
     
-    def generate_push_statistics(self):
-        """生成推送统计报告"""
-        print("\n📊 生成推送统计报告...")
+    async def teardown(self):
+        """回收后台Webhook连接测试：推送阶段未取用时取消并读取其结果，避免异常无人处理"""
+        for probe in self.webhook_probes:
+            if not probe.done():
+                probe.cancel()
+        await asyncio.gather(*self.webhook_probes, return_exceptions=True)
+        self.webhook_probes = []
+    
+    def display_full_report(self):
+        """展示完整的深度研究报告"""
+        log.info("\n" + "="*80)
+        log.info("📊 **完整深度研究报告展示**")
+        log.info("="*80)
         
-        with app.app_context():
-            # 统计报告数量
-            total_reports = ReportRecord.query.count()
-            success_reports = ReportRecord.query.filter_by(status='success').count()
-            failed_reports = ReportRecord.query.filter_by(status='failed').count()
+        latest_report = self.latest_report
+        
+        if not latest_report:
+            log.info("❌ 未找到深度研究报告")
+            return False
+        
+        log.info(f"📋 **报告标题：** {latest_report.title}")
+        log.info(f"🕐 **生成时间：** {latest_report.generated_at.strftime('%Y-%m-%d %H:%M:%S')}")
+        log.info(f"📄 **报告长度：** {self.report_view.length} 字符")
+        log.info(f"✅ **状态：** {latest_report.status}")
+        
+        log.info("\n" + "-"*80)
+        log.info("📖 **完整报告内容：**")
+        log.info("-"*80)
+        
+        # 分段显示报告内容，增加可读性（先拼装完整文本，再一次性输出）
+        output_lines = []
+        for line in self.report_view.lines:
+            if not line.strip():
+                output_lines.append('')
+                continue
+            match = LINE_PATTERN.match(line)
+            output_lines.append(LINE_DECORATIONS[match.lastgroup] + line if match else line)
+        
+        log.info('\n'.join(output_lines))
+        
+        log.info("\n" + "="*80)
+        log.info("✅ **报告展示完成**")
+        log.info("="*80)
+        
+        return True
+    
+    def test_notification_formatting(self):
+        """测试通知格式化"""
+        log.info("\n📱 测试通知格式化...")
+        
+        latest_report = self.latest_report
+        
+        if not latest_report:
+            log.info("❌ 未找到报告数据")
+            return False
+        
+        # 测试深度研究报告格式化
+        log.info("📝 格式化深度研究报告通知...")
+        formatted_notification = self.notification_service.format_deep_research_for_notification(
+            self.report_view.content
+        )
+        
+        log.info(f"✅ 通知格式化完成，长度: {len(formatted_notification)} 字符")
+        log.info("\n" + "-"*60)
+        log.info("📲 **格式化后的通知内容：**")
+        log.info("-"*60)
+        log.info(formatted_notification)
+        log.info("-"*60)
+        
+        return formatted_notification
+    
+    def _load_webhook_targets(self):
+        """读取报告配置中的Webhook URL，未配置时使用测试URL"""
+        report_configs = ReportConfig.query.filter(
+            ReportConfig.webhook_url.isnot(None),
+            ReportConfig.webhook_url != ''
+        ).all()
+        
+        if not report_configs:
+            log.info("⚠️ 未找到配置的Webhook URL，使用测试URL")
+            return [
+                {
+                    'type': 'wechat',
+                    'url': 'https://qyapi.weixin.qq.com/cgi-bin/webhook/send?key=test-key',
+                    'name': '企业微信测试群'
+                },
+                {
+                    'type': 'jinshan',
+                    'url': 'https://open.feishu.cn/open-apis/bot/v2/hook/test-hook',
+                    'name': '飞书测试群'
+                }
+            ]
+        
+        test_urls = []
+        for config in report_configs:
+            test_urls.append({
+                'type': config.notification_type,
+                'url': config.webhook_url,
+                'name': f'{config.name}的通知群'
+            })
+        return test_urls
+    
+    async def test_webhook_with_real_content(self, formatted_content):
+        """使用真实内容测试Webhook"""
+        log.info("\n🔗 测试实际Webhook推送...")
+        
+        test_urls = self.webhook_targets
+        
+        # 同一份内容一次性批量推送到所有群，连接测试已在初始化时后台发起
+        push_results = await asyncio.to_thread(
+            self.notification_service.send_many,
+            [(c['type'], c['url']) for c in test_urls],
+            formatted_content,
+            "🤖 深度研究报告 - 测试推送"
+        )
+        probe_results = await asyncio.gather(*self.webhook_probes)
+        
+        results = []
+        
+        for webhook_config, success, test_result in zip(test_urls, push_results, probe_results):
+            log.info(f"\n📤 推送到 {webhook_config['name']} ({webhook_config['type']})...")
+            log.info(f"   URL: {webhook_config['url'][:50]}...")
             
-            # 统计通知发送情况
-            sent_notifications = ReportRecord.query.filter_by(notification_sent=True).count()
+            if success:
+                log.info(f"   ✅ 推送成功！")
+                results.append(True)
+            else:
+                log.info(f"   ❌ 推送失败（可能是测试URL或网络问题）")
+                results.append(False)
+            
+            if test_result['success']:
+                log.info(f"   🔗 连接测试: ✅ 成功")
+            else:
+                log.info(f"   🔗 连接测试: ❌ {test_result['message']}")
+        
+        return any(results)
+    
+    def simulate_real_group_push(self):
+        """模拟真实的群推送场景"""
+        log.info("\n🎭 模拟真实群推送场景...")
+        
+        # 模拟不同类型的群推送
+        scenarios = [
+            {
+                'name': '技术团队群',
+                'type': 'wechat',
+                'focus': '技术细节和实现方案',
+                'audience': '开发者和技术专家'
+            },
+            {
+                'name': '管理层决策群',
+                'type': 'jinshan',
+                'focus': '战略洞察和商业影响',
+                'audience': '高管和决策者'
+            },
+            {
+                'name': '产品运营群',
+                'type': 'wechat',
+                'focus': '市场趋势和用户影响',
+                'audience': '产品经理和运营人员'
+            }
+        ]
+        
+        latest_report = self.latest_report
+        
+        if not latest_report:
+            log.info("❌ 未找到报告数据")
+            return False
+        
+        # 推送时间每个阶段只格式化一次
+        ts = datetime.now().strftime('%Y-%m-%d %H:%M')
+        
+        for scenario in scenarios:
+            log.info(f"\n📱 推送到 **{scenario['name']}**")
+            log.info(f"   👥 目标受众: {scenario['audience']}")
+            log.info(f"   🎯 关注重点: {scenario['focus']}")
+            log.info(f"   📢 推送平台: {scenario['type']}")
             
-            # 统计深度研究报告
-            deep_research_reports = ReportRecord.query.join(ReportConfig).filter(
-                ReportConfig.enable_deep_research == True
-            ).count()
+            # 根据不同受众定制通知内容
+            custom_content = PUSH_TEMPLATES.get(scenario['focus'], PRODUCT_PUSH_TEMPLATE).substitute(ts=ts)
             
-            print(f"""
+            # 模拟发送（实际环境中会调用真实API）
+            log.info(f"   📤 推送内容预览:")
+            log.info("   " + "-"*50)
+            log.info("\n".join(f"   {line}" for line in custom_content.split('\n', 10)[:10]))
+            log.info("   ...")
+            log.info("   " + "-"*50)
+            log.info(f"   ✅ 模拟推送完成")
+        
+        return True
+    
+    def generate_push_statistics(self):
+        """生成推送统计报告"""
+        log.info("\n📊 生成推送统计报告...")
+        
+        # 一次查询完成全部统计（条件聚合，避免多次往返数据库）
+        stats = db.session.query(
+            db.func.count(ReportRecord.id),
+            db.func.sum(db.case((ReportRecord.status == 'success', 1), else_=0)),
+            db.func.sum(db.case((ReportRecord.status == 'failed', 1), else_=0)),
+            db.func.sum(db.case((ReportRecord.notification_sent == True, 1), else_=0)),
+            db.func.sum(db.case((ReportConfig.enable_deep_research == True, 1), else_=0))
+        ).select_from(ReportRecord).outerjoin(
+            ReportConfig, ReportRecord.report_config_id == ReportConfig.id
+        ).one()
+        
+        # 空表时SUM返回NULL，统一转换为0
+        total_reports, success_reports, failed_reports, sent_notifications, deep_research_reports = (
+            value or 0 for value in stats
+        )
+        
+        log.info(f"""
 📈 **推送统计报告**
 {'='*50}
 📊 **报告生成统计：**
@@ -356,43 +427,43 @@ class GroupNotificationTester:
         
         return True
 
-async def main():
-    """主测试函数"""
-    print("🚀 开始群推送和深度研究报告测试")
-    print("="*80)
-    
-    tester = GroupNotificationTester()
-    
-    # 初始化
-    if not tester.setup():
-        print("❌ 测试环境初始化失败")
-        return False
-    
+async def run_all_tests(tester):
+    """依次执行各项测试，每个阶段结束时写出缓冲的输出"""
     try:
+        # 初始化
+        if not tester.setup():
+            log.info("❌ 测试环境初始化失败")
+            return False
+        
         # 1. 展示完整的深度研究报告
-        print("\n📖 **第一步：展示完整深度研究报告**")
+        log.info("\n📖 **第一步：展示完整深度研究报告**")
         report_success = tester.display_full_report()
+        flush_log()
         
         # 2. 测试通知格式化
-        print("\n📱 **第二步：测试通知格式化**")
+        log.info("\n📱 **第二步：测试通知格式化**")
         formatted_content = tester.test_notification_formatting()
+        flush_log()
         
         # 3. 测试实际Webhook推送
-        print("\n🔗 **第三步：测试实际Webhook推送**")
-        webhook_success = tester.test_webhook_with_real_content(formatted_content)
+        log.info("\n🔗 **第三步：测试实际Webhook推送**")
+        webhook_success = await tester.test_webhook_with_real_content(formatted_content)
+        flush_log()
         
         # 4. 模拟真实群推送场景
-        print("\n🎭 **第四步：模拟真实群推送场景**")
+        log.info("\n🎭 **第四步：模拟真实群推送场景**")
         simulation_success = tester.simulate_real_group_push()
+        flush_log()
         
         # 5. 生成推送统计报告
-        print("\n📊 **第五步：生成推送统计报告**")
+        log.info("\n📊 **第五步：生成推送统计报告**")
         stats_success = tester.generate_push_statistics()
+        flush_log()
         
         # 汇总结果
-        print("\n" + "="*80)
-        print("📋 **测试结果汇总**")
-        print("="*80)
+        log.info("\n" + "="*80)
+        log.info("📋 **测试结果汇总**")
+        log.info("="*80)
         
         results = {
             "完整报告展示": report_success,
@@ -404,29 +475,51 @@ async def main():
         
         for test_name, result in results.items():
             status = "✅ 通过" if result else "❌ 失败"
-            print(f"   {test_name}: {status}")
+            log.info(f"   {test_name}: {status}")
         
         passed_tests = sum(1 for result in results.values() if result)
         total_tests = len(results)
         
-        print(f"\n🎯 **总体结果:** {passed_tests}/{total_tests} 项测试通过")
+        log.info(f"\n🎯 **总体结果:** {passed_tests}/{total_tests} 项测试通过")
         
         if passed_tests == total_tests:
-            print("🎉 **所有测试通过！群推送和深度研究报告功能运行正常**")
+            log.info("🎉 **所有测试通过！群推送和深度研究报告功能运行正常**")
             return True
         else:
-            print("⚠️ **部分测试失败，请检查相关配置**")
+            log.info("⚠️ **部分测试失败，请检查相关配置**")
             return False
             
     except Exception as e:
-        print(f"\n❌ 测试过程中发生错误: {e}")
+        log.info(f"\n❌ 测试过程中发生错误: {e}")
+        flush_log()
         import traceback
         traceback.print_exc()
         return False
+    finally:
+        await tester.teardown()
+
+async def main():
+    """主测试函数"""
+    log_listener.start()
+    try:
+        log.info("🚀 开始群推送和深度研究报告测试")
+        log.info("="*80)
+        
+        # 所有阶段共用同一个应用上下文，setup中查询的报告对象在各阶段保持可用
+        with app.app_context():
+            tester = GroupNotificationTester()
+            return await run_all_tests(tester)
+    finally:
+        # 处理完队列中剩余的日志后全部写出
+        log_listener.stop()
+        _buffer_handler.flush()
 
 if __name__ == "__main__":
     print("🎯 启动群推送和深度研究报告测试...")
-    success = asyncio.run(main())
+    if UVLOOP_AVAILABLE:
+        success = uvloop.run(main())
+    else:
+        success = asyncio.run(main())
     
     if success:
         print("\n🎊 **测试完成！群推送和深度研究报告功能正常运行**")
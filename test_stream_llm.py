@@ -8,13 +8,35 @@ import asyncio
 import sys
 import os
 import time
+from dataclasses import dataclass
+from functools import lru_cache
 
 # 添加项目根目录到Python路径
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-from app import app
 from services.llm_service import LLMService
-from models import GlobalSettings
+
+@dataclass(frozen=True)
+class LLMSettingsSnapshot:
+    """LLM服务用到的全局设置字段副本，不依赖数据库会话，可跨应用上下文复用"""
+    llm_provider: str
+    llm_api_key: str
+    llm_model_name: str
+    llm_base_url: str
+
+@lru_cache(maxsize=1)
+def _settings_snapshot():
+    """获取全局设置快照，整个测试过程只查询一次数据库；未配置时返回None"""
+    from models import GlobalSettings
+    settings = GlobalSettings.query.first()
+    if not settings:
+        return None
+    return LLMSettingsSnapshot(
+        llm_provider=settings.llm_provider,
+        llm_api_key=settings.llm_api_key,
+        llm_model_name=settings.llm_model_name,
+        llm_base_url=settings.llm_base_url
+    )
 
 def test_stream_vs_normal():
     """测试流式返回 vs 普通返回"""
@@ -22,9 +44,12 @@ def test_stream_vs_normal():
     print("="*60)
     
     try:
+        # 延迟导入Flask应用，只在实际执行LLM测试时加载
+        from app import app
+        
         with app.app_context():
             # 获取LLM设置
-            settings = GlobalSettings.query.first()
+            settings = _settings_snapshot()
             if not settings or not settings.llm_api_key:
                 print("❌ LLM配置未找到")
                 return False
@@ -117,8 +142,11 @@ def test_timeout_resistance():
     print("="*50)
     
     try:
+        # 延迟导入Flask应用，只在实际执行LLM测试时加载
+        from app import app
+        
         with app.app_context():
-            settings = GlobalSettings.query.first()
+            settings = _settings_snapshot()
             if not settings or not settings.llm_api_key:
                 print("❌ LLM配置未找到")
                 return False
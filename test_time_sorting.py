@@ -11,8 +11,7 @@ import os
 # 添加项目根目录到Python路径
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-from services.deep_research_service import DeepResearchService
-from services.crawler_service import CrawlerService
+from services.deep_research_service import DeepResearchService, rank_results_by_recency
 from services.llm_service import LLMService
 
 async def test_time_sorting():
@@ -20,6 +19,9 @@ async def test_time_sorting():
     print("⏰ 测试搜索结果时间排序功能")
     print("="*50)
     
+    # 爬虫服务依赖crawl4ai，只在完整流程测试中导入
+    from services.crawler_service import CrawlerService
+    
     # 创建服务实例
     crawler_service = CrawlerService()
     llm_service = LLMService()
@@ -81,13 +83,10 @@ async def test_time_sorting():
         )
         
         print(f"✅ AI选择了 {len(selected_urls)} 个URL:")
+        results_by_url = {result['url']: result for result in mock_search_results}
         for i, url in enumerate(selected_urls, 1):
             # 找到对应的文章标题
-            title = "未知"
-            for result in mock_search_results:
-                if result['url'] == url:
-                    title = result['title']
-                    break
+            title = results_by_url.get(url, {}).get('title', '未知')
             print(f"{i}. {title}")
             print(f"   URL: {url}")
         
@@ -116,11 +115,6 @@ async def test_sorting_algorithm():
     """测试排序算法逻辑"""
     print("\n🔧 测试排序算法逻辑...")
     
-    # 创建服务实例
-    crawler_service = CrawlerService()
-    llm_service = LLMService()
-    deep_research_service = DeepResearchService(crawler_service, llm_service)
-    
     # 测试数据
     test_results = [
         {'title': '2023年报告', 'snippet': '旧数据', 'date': '2023-01-01', 'url': 'url1'},
@@ -129,41 +123,8 @@ async def test_sorting_algorithm():
         {'title': '普通文章', 'snippet': '普通内容', 'date': '', 'url': 'url4'},
     ]
     
-    # 模拟排序逻辑（与实际代码一致）
-    sorted_results = []
-    for result in test_results:
-        date_score = 0
-        
-        title = result.get('title', '').lower()
-        snippet = result.get('snippet', '').lower()
-        
-        # 最新时间词汇得分最高
-        latest_keywords = ['2025', '最新', '今日', '刚刚', 'latest', 'today']
-        recent_keywords = ['2024', '近期', '最近', 'recent', 'new']
-        
-        for keyword in latest_keywords:
-            if keyword in title or keyword in snippet:
-                date_score += 100
-        
-        for keyword in recent_keywords:
-            if keyword in title or keyword in snippet:
-                date_score += 50
-        
-        # 如果有具体日期，根据年份给分
-        if result.get('date'):
-            date_str = result['date']
-            if '2025' in date_str:
-                date_score += 90
-            elif '2024' in date_str:
-                date_score += 60
-            elif '2023' in date_str:
-                date_score += 30
-            else:
-                date_score += 10
-        
-        sorted_results.append((result, date_score))
-    
-    sorted_results.sort(key=lambda x: x[1], reverse=True)
+    # 使用与实际代码相同的评分排序函数
+    sorted_results = rank_results_by_recency(test_results)
     
     print("📊 排序结果:")
     for i, (result, score) in enumerate(sorted_results, 1):